@@ -10,19 +10,68 @@ class Config:
     # Paths
     BASE_DIR = Path(__file__).parent
     PROMPTS_DIR = BASE_DIR / "prompts"
-    SYSTEM_PROMPT_FILE = PROMPTS_DIR / "system_prompt.txt"
+    # "full" is the original verbose format; "compact" sends classes as `index|time|name` with a short prompt
+    # (opt-in until a real-model run of scripts/bench_llm_selection.py shows it is as accurate)
+    PROMPT_STYLE = os.environ.get("PROMPT_STYLE", "full")
+    PROMPT_FILES = {"full": "system_prompt.txt", "compact": "system_prompt_compact.txt"}
+    SYSTEM_PROMPT_FILE = PROMPTS_DIR / PROMPT_FILES.get(PROMPT_STYLE, "system_prompt.txt")
+    PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "2048"))
+    # Stream the LLM answer and act on selected_index as soon as it appears
+    LLM_STREAMING = os.environ.get("LLM_STREAMING", "true").lower() == "true"
+    LLM_STREAM_CUTOFF = os.environ.get("LLM_STREAM_CUTOFF", "false").lower() == "true"  # Stop generating once chosen
+    # Malformed answers are re-asked (LLM step only) up to LLM_MAX_ATTEMPTS times within LLM_DEADLINE_SECONDS
+    LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "3"))
+    LLM_DEADLINE_SECONDS = float(os.environ.get("LLM_DEADLINE_SECONDS", "90"))
+    # Book a heuristic pick (with notify_user) if the LLM has not chosen within this many seconds; 0 waits forever
+    LLM_BUDGET_SECONDS = float(os.environ.get("LLM_BUDGET_SECONDS", "20"))
+    # Multi-date mode asks for every date's selection in one LLM request
+    LLM_BATCH = os.environ.get("LLM_BATCH", "true").lower() == "true"
 
     # Wodify credentials
     WODIFY_EMAIL = os.environ.get("EMAIL", "")
     WODIFY_PASSWORD = os.environ.get("PASSWORD", "")
-    WODIFY_URL = "https://app.wodify.com"
+    WODIFY_URL = os.environ.get("WODIFY_URL", "https://app.wodify.com")  # Point at scripts/stub_wodify_site.py to run offline
 
     # Scheduling
     DAYS_AHEAD = int(os.environ.get("DAYS_AHEAD", "1"))  # Book for tomorrow by default
+    # Multi-date mode: e.g. "1,2,3,4,5" books the next five days with one login
+    DAYS_AHEAD_LIST = [int(d) for d in os.environ.get("DAYS_AHEAD_LIST", "").split(",") if d.strip()]
+
+    # Run mode: "book" (default), "snipe" (pre-position, then book the instant the window opens)
+    # or "monitor" (watch a full class and book when a spot opens)
+    MODE = os.environ.get("MODE", "book")
+    SNIPE_AT = os.environ.get("SNIPE_AT", "19:00:00")  # Local time the reservation window opens
+    SNIPE_RESYNC_SECONDS = 60  # Re-measure clock skew this long before the opening
+    SNIPE_POLL_SECONDS = float(os.environ.get("SNIPE_POLL_SECONDS", "10"))  # How long to poll the buttons for one to open
+    SNIPE_POLL_INTERVAL = 0.05  # Seconds between button polls
+
+    # Monitor mode polling: interval is this fraction of the time left, clamped to [MIN, MAX] seconds
+    MONITOR_BACKOFF_FRACTION = float(os.environ.get("MONITOR_BACKOFF_FRACTION", "0.01"))
+    MONITOR_MIN_INTERVAL = float(os.environ.get("MONITOR_MIN_INTERVAL", "5"))
+    MONITOR_MAX_INTERVAL = float(os.environ.get("MONITOR_MAX_INTERVAL", "300"))
+    MONITOR_CUTOFF_MINUTES = int(os.environ.get("MONITOR_CUTOFF_MINUTES", "30"))  # Stop this long before class
+    MONITOR_RESPONSE_TIMEOUT = 5000  # ms to wait for each poll's calendar data before reading the rows anyway
+
+    # Pipeline: "sync" runs steps in sequence, "async" also overlaps LLM setup/notifications with browser work
+    PIPELINE = os.environ.get("PIPELINE", "sync")
 
     # Ollama configuration
     OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://ollama:11434")
     OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "qwen3:8b")
+    # Model cascade, smallest first, e.g. "qwen3:0.6b,qwen3:8b"; a later model is only asked when an earlier
+    # one fails or reports confidence below CASCADE_MIN_CONFIDENCE. Defaults to OLLAMA_MODEL alone.
+    OLLAMA_MODELS = [m.strip() for m in os.environ.get("OLLAMA_MODELS", "").split(",") if m.strip()] or [OLLAMA_MODEL]
+    CASCADE_MIN_CONFIDENCE = float(os.environ.get("CASCADE_MIN_CONFIDENCE", "0.8"))
+    # How long Ollama keeps the model loaded after each request (Ollama's own default is 5m)
+    OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_UNLOAD_AFTER_RUN = os.environ.get("OLLAMA_UNLOAD_AFTER_RUN", "false").lower() == "true"
+
+    # Class selection: clear-cut days are decided by rules, the LLM only sees unusual schedules
+    RULE_FAST_PATH = os.environ.get("RULE_FAST_PATH", "true").lower() == "true"
+    PREFERRED_WINDOW = os.environ.get("PREFERRED_WINDOW", "7:00 AM - 8:00 AM")  # Keep in sync with system_prompt.txt
+    DECISION_CACHE = os.environ.get("DECISION_CACHE", "true").lower() == "true"  # Reuse answers for repeat schedules
+    DECISION_CACHE_TTL_DAYS = int(os.environ.get("DECISION_CACHE_TTL_DAYS", "28"))
+    DECISION_CACHE_SIZE = 200
 
     # Pushover configuration
     PUSHOVER_USER_KEY = os.environ.get("PUSHOVER_USER_KEY", "")
@@ -32,11 +81,50 @@ class Config:
     # Browser configuration
     HEADLESS = os.environ.get("HEADLESS", "true").lower() == "true"
     SCREENSHOT_DIR = BASE_DIR.parent / "screenshots"
+    # Flight recorder: snapshots kept in memory, written to SCREENSHOT_DIR only when a step fails
+    RECORDER_CAPACITY = int(os.environ.get("RECORDER_CAPACITY", "20"))
+    RECORDER_IMAGES = os.environ.get("RECORDER_IMAGES", "false").lower() == "true"  # Viewport JPEG per step
+    RECORDER_JPEG_QUALITY = 50
+    RECORDER_DOM_CHARS = 200_000
+    RECORDER_MAX_MB = int(os.environ.get("RECORDER_MAX_MB", "50"))
+    BOOKING_BACKEND = os.environ.get("BOOKING_BACKEND", "browser")  # "api" books over HTTP once requests are recorded
+    CLASS_SOURCE = os.environ.get("CLASS_SOURCE", "dom")  # "feed" parses the calendar XHR, "dom" scrapes rows
+    EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "evaluate")  # "evaluate" (one round-trip) or "locator"
+    BROWSER_WS_ENDPOINT = os.environ.get("BROWSER_WS_ENDPOINT", "")  # e.g. ws://browser:3000/
+    BROWSER_CDP_ENDPOINT = os.environ.get("BROWSER_CDP_ENDPOINT", "")  # e.g. http://browser:9222
+    BROWSER_CONNECT_TIMEOUT = 5000  # ms before falling back to a local launch
+    CACHE_DIR = Path(os.environ.get("CACHE_DIR", str(BASE_DIR.parent / "cache")))
+
+    # Resource filtering ("off", "observe" to measure only, or "block")
+    RESOURCE_FILTER = os.environ.get("RESOURCE_FILTER", "block")
+    BLOCKED_RESOURCE_TYPES = [
+        t.strip() for t in os.environ.get("BLOCKED_RESOURCE_TYPES", "image,media,font").split(",") if t.strip()
+    ]
+    BLOCKED_URL_PATTERNS = [
+        r"google-analytics\.com",
+        r"googletagmanager\.com",
+        r"doubleclick\.net",
+        r"connect\.facebook\.net",
+        r"hotjar\.com",
+        r"segment\.(io|com)",
+        r"intercom(cdn)?\.(io|com)",
+        r"bam\.nr-data\.net",
+    ]
+
+    # Session reuse (encrypted Playwright storage_state per account)
+    SESSION_REUSE = os.environ.get("SESSION_REUSE", "true").lower() == "true"
+    SESSION_DIR = Path(os.environ.get("SESSION_DIR", str(BASE_DIR.parent / "sessions")))
+    SESSION_SECRET = os.environ.get("SESSION_SECRET", "")  # Falls back to PASSWORD when unset
+    SESSION_MAX_AGE_HOURS = int(os.environ.get("SESSION_MAX_AGE_HOURS", "168"))
 
     # Timeouts (milliseconds)
     PAGE_LOAD_TIMEOUT = 30000
     ELEMENT_WAIT_TIMEOUT = 10000
-    CALENDAR_LOAD_WAIT = 5000
+    CALENDAR_SETTLE_MS = 500  # Row count must hold steady this long before the calendar counts as loaded
+    CALENDAR_REPLACE_MS = 3000  # Longest wait for the previous day's rows to be replaced (a day can start with the same row)
+
+    # Regex for the OutSystems data request that (re)loads the class list
+    CALENDAR_DATA_URL_PATTERN = os.environ.get("CALENDAR_DATA_URL_PATTERN", r"/screenservices/")
 
     @classmethod
     def validate(cls) -> tuple[bool, list[str]]:
@@ -52,6 +140,9 @@ class Config:
         if not cls.WODIFY_PASSWORD:
             errors.append("PASSWORD environment variable not set")
 
+        if cls.PROMPT_STYLE not in cls.PROMPT_FILES:
+            errors.append(f"Unknown PROMPT_STYLE '{cls.PROMPT_STYLE}' (expected one of: {', '.join(cls.PROMPT_FILES)})")
+
         if not cls.SYSTEM_PROMPT_FILE.exists():
             errors.append(f"System prompt file not found: {cls.SYSTEM_PROMPT_FILE}")
 
@@ -61,7 +152,8 @@ class Config:
         return (len(errors) == 0, errors)
 
     @classmethod
-    def get_system_prompt(cls) -> str:
-        """Load system prompt from file"""
-        with open(cls.SYSTEM_PROMPT_FILE, "r") as f:
+    def get_system_prompt(cls, style: str = None) -> str:
+        """Load system prompt from file (for PROMPT_STYLE unless a style is given)"""
+        path = cls.PROMPTS_DIR / cls.PROMPT_FILES.get(style, "system_prompt.txt") if style else cls.SYSTEM_PROMPT_FILE
+        with open(path, "r") as f:
             return f.read()
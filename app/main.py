@@ -5,12 +5,11 @@ Main entry point for automated class booking
 """
 
 import sys
+import asyncio
 from app.config import Config
 from app.utils.logger import setup_logger
 from app.utils.date import get_target_date, format_date_for_wodify, get_human_readable_date
-from app.services.browser import BrowserService
-from app.services.llm import LLMService
-from app.services.notification import NotificationService
+from app.orchestrator import run_async, run_monitor, run_multi_date, run_snipe, run_sync
 
 
 def main() -> int:
@@ -34,6 +33,11 @@ def main() -> int:
             logger.error(f"  - {error}")
         return 1
 
+    if Config.DAYS_AHEAD_LIST:
+        target_dates = [get_target_date(days) for days in Config.DAYS_AHEAD_LIST]
+        logger.info(f"Target dates: {', '.join(get_human_readable_date(d) for d in target_dates)}")
+        return asyncio.run(run_multi_date(logger, target_dates))
+
     # Calculate target date
     target_date = get_target_date(Config.DAYS_AHEAD)
     target_date_str = format_date_for_wodify(target_date)
@@ -41,74 +45,13 @@ def main() -> int:
 
     logger.info(f"Target date: {human_date} ({target_date_str})")
 
-    # Initialize services
-    notification = NotificationService(logger)
-    llm_service = LLMService(logger)
-
-    try:
-        # Browser automation
-        with BrowserService(logger) as browser:
-            # Step 1: Login
-            logger.info("Step 1: Logging in to Wodify...")
-            browser.login()
-
-            # Step 2: Navigate to calendar
-            logger.info("Step 2: Opening Class Calendar...")
-            browser.navigate_to_calendar()
-
-            # Step 3: Select target date
-            logger.info(f"Step 3: Selecting date {target_date_str}...")
-            browser.select_date(target_date_str)
-
-            # Step 4: Extract classes
-            logger.info("Step 4: Extracting class list...")
-            classes = browser.extract_classes()
-
-            if not classes:
-                raise Exception("No classes found for the target date")
-
-            logger.info(f"Found {len(classes)} classes:")
-            for cls in classes:
-                logger.info(f"  {cls.to_display_string()}")
-
-            # Step 5: LLM selection
-            logger.info("Step 5: Consulting LLM for class selection...")
-            llm_response = llm_service.select_class(classes)
-
-            selected_class = classes[llm_response.selected_index]
-            logger.info(f"Selected: {selected_class.class_name} at {selected_class.time_range}")
-            logger.info(f"Reason: {llm_response.reasoning}")
-
-            # Step 6: Book the class
-            logger.info("Step 6: Booking selected class...")
-            browser.book_class(selected_class)
-
-            # Step 7: Notifications
-            logger.info("Step 7: Handling notifications...")
-            if llm_response.notify_user:
-                logger.info("Sending notification (unusual selection)")
-                notification.notify_unusual_selection(
-                    class_name=selected_class.class_name,
-                    time_range=selected_class.time_range,
-                    reasoning=llm_response.reasoning,
-                )
-            else:
-                logger.info("No notification needed (standard booking)")
-
-            logger.info("=" * 60)
-            logger.info("✓ SUCCESS: Class booked successfully")
-            logger.info("=" * 60)
-            return 0
-
-    except Exception as e:
-        logger.error("=" * 60)
-        logger.error(f"❌ ERROR: {str(e)}")
-        logger.error("=" * 60)
-
-        # Send error notification
-        notification.notify_error(str(e))
-
-        return 1
+    if Config.MODE == "snipe":
+        return run_snipe(logger, target_date_str)
+    if Config.MODE == "monitor":
+        return run_monitor(logger, target_date, target_date_str)
+    if Config.PIPELINE == "sync":
+        return run_sync(logger, target_date, target_date_str)
+    return asyncio.run(run_async(logger, target_date, target_date_str))
 
 
 if __name__ == "__main__":
@@ -1,12 +1,79 @@
 """Data models for the Wodify signup application"""
 
-from dataclasses import dataclass
-from typing import Optional
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterator, Optional
 
+TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})\s*([AP]M)", re.I)
+REGULAR_CLASS_PATTERN = re.compile(r"^CrossFit:\s*\d{1,2}:\d{2}\s*[AP]M$", re.I)
+OPEN_GYM_PATTERN = re.compile(r"open\s*gym", re.I)
 
-@dataclass
+# Class categories
+CROSSFIT = "crossfit"  # Regular "CrossFit: H:MM AM" class
+OPEN_GYM = "open_gym"
+NAMED_WOD = "wod"  # Anything else: MURPH, ALL DAY "CHAD", ...
+
+# Booking states, from the button text
+BOOKABLE = "bookable"
+BOOKED = "booked"
+FULL = "full"
+UNAVAILABLE = "unavailable"
+
+# Short state tokens for the compact prompt
+STATE_TOKENS = {BOOKABLE: "BOOK", BOOKED: "BOOKED", FULL: "FULL", UNAVAILABLE: "CLOSED"}
+
+
+def parse_clock(text: str) -> Optional[int]:
+    """Minutes after midnight for "7:00 AM" style times"""
+    match = TIME_PATTERN.search(text)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), match.group(3).upper()
+    return (hour % 12 + (12 if meridiem == "PM" else 0)) * 60 + minute
+
+
+def parse_time_range(time_range: str) -> Optional[tuple[int, int]]:
+    """(start, end) in minutes after midnight, or None if the range is unreadable"""
+    parts = time_range.split(" - ")
+    if len(parts) != 2:
+        return None
+    start, end = parse_clock(parts[0]), parse_clock(parts[1])
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+def categorize(class_name: str) -> str:
+    name = class_name.strip()
+    if OPEN_GYM_PATTERN.search(name):
+        return OPEN_GYM
+    if REGULAR_CLASS_PATTERN.match(name):
+        return CROSSFIT
+    return NAMED_WOD
+
+
+def booking_state(button_text: str) -> str:
+    text = button_text.upper()
+    if "BOOK" in text:
+        return BOOKABLE
+    if "MANAGE" in text or "CANCEL" in text:
+        return BOOKED
+    if "FULL" in text or "WAITLIST" in text:
+        return FULL
+    return UNAVAILABLE
+
+
+@dataclass(slots=True)
 class ClassInfo:
-    """Represents a single class from the Wodify schedule"""
+    """
+    Represents a single class from the Wodify schedule
+
+    start/end (minutes after midnight, None if unreadable), category and
+    state are parsed once on construction; use update_button() rather than
+    assigning button_text so state follows.
+    """
 
     index: int
     time_range: str
@@ -15,14 +82,136 @@ class ClassInfo:
     button_id: Optional[str]
     button_text: str
 
+    # Only known when parsed from the calendar data feed (source="feed")
+    capacity: Optional[int] = None
+    reserved: Optional[int] = None
+    reservation_state: Optional[str] = None
+    source: str = "dom"
+    start_date: Optional[datetime] = None
+    class_id: Optional[str] = None
+
+    start: Optional[int] = field(init=False, default=None, repr=False, compare=False)
+    end: Optional[int] = field(init=False, default=None, repr=False, compare=False)
+    category: str = field(init=False, default=NAMED_WOD, repr=False, compare=False)
+    state: str = field(init=False, default=UNAVAILABLE, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.start, self.end = parse_time_range(self.time_range) or (None, None)
+        self.category = categorize(self.class_name)
+        self.state = booking_state(self.button_text)
+
+    @property
+    def duration(self) -> Optional[int]:
+        return self.end - self.start if self.start is not None else None
+
+    def update_button(self, button_id: Optional[str], button_text: str):
+        """Take a fresh button id/text from the page (e.g. while monitoring)"""
+        self.button_id = button_id
+        self.button_text = button_text
+        self.state = booking_state(button_text)
+
     def to_display_string(self) -> str:
         """Format as display string for LLM input"""
         button_info = f"{self.button_text} (#{self.button_id})" if self.button_id else f"{self.button_text} (#None)"
         return f"{self.index:02d}: {self.time_range:20s} | {self.class_name:20s} | Coach: {self.coach:15s} | Button: {button_info}"
 
+    def to_compact_string(self) -> str:
+        """Minimal `index|time|name|state` line for the compact LLM prompt"""
+        time_range, name = " ".join(self.time_range.split()), " ".join(self.class_name.split())
+        return f"{self.index}|{time_range}|{name}|{STATE_TOKENS[self.state]}"
+
     def is_bookable(self) -> bool:
         """Check if this class can be booked"""
-        return self.button_id is not None and "BOOK" in self.button_text.upper()
+        # Feed classes have no button id; book_class finds their row by text instead
+        has_target = self.button_id is not None or self.source == "feed"
+        return has_target and self.state == BOOKABLE
+
+
+class Schedule:
+    """
+    A day's classes indexed by start time
+
+    Classes are sorted once; overlap and nearest-start queries then bisect
+    the start times instead of re-parsing every time_range. Classes with
+    an unreadable time are kept in `untimed` and never match a query.
+    """
+
+    def __init__(self, classes: list[ClassInfo]):
+        self.classes = list(classes)
+        self.timed = sorted((c for c in self.classes if c.start is not None), key=lambda c: (c.start, c.index))
+        self.untimed = [c for c in self.classes if c.start is None]
+        self.starts = [c.start for c in self.timed]
+        self.longest = max((c.duration for c in self.timed), default=0)
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def __iter__(self) -> Iterator[ClassInfo]:
+        return iter(self.classes)
+
+    def overlapping(self, start: int, end: int) -> list[ClassInfo]:
+        """
+        Classes running at any point in [start, end)
+
+        Only classes starting within the longest class duration before
+        `start` can still be running, so that slice is all that is checked.
+        """
+        lo = bisect_left(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, end)
+        return [c for c in self.timed[lo:hi] if c.end > start]
+
+    def nearest_start(
+        self, minute: int, predicate: Optional[Callable[[ClassInfo], bool]] = None
+    ) -> Optional[ClassInfo]:
+        """
+        The class starting closest to `minute` (earlier index on a tie)
+
+        Args:
+            minute: Minutes after midnight
+            predicate: Only consider classes it accepts
+
+        Returns:
+            ClassInfo, or None if no timed class matches
+        """
+        right = bisect_left(self.starts, minute)
+        left = right - 1
+        accept = predicate or (lambda c: True)
+        while left >= 0 and not accept(self.timed[left]):
+            left -= 1
+        # Walking left lands on the highest index among equal starts; prefer the lowest
+        same = left
+        while same > 0 and self.timed[same - 1].start == self.timed[left].start:
+            same -= 1
+            if accept(self.timed[same]):
+                left = same
+        while right < len(self.timed) and not accept(self.timed[right]):
+            right += 1
+        candidates = [self.timed[i] for i in (left, right) if 0 <= i < len(self.timed)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: (abs(c.start - minute), c.index))
+
+
+@dataclass
+class BookingResult:
+    """Outcome of booking one date in multi-date mode"""
+
+    date_str: str
+    human_date: str
+    selected: Optional[ClassInfo] = None
+    llm_response: Optional["LLMResponse"] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.selected is not None
+
+    def to_report_line(self) -> str:
+        """One-line summary for logs and notifications"""
+        if self.succeeded:
+            return f"{self.human_date}: {self.selected.class_name} at {self.selected.time_range}"
+        return f"{self.human_date}: FAILED - {self.error}"
 
 
 @dataclass
@@ -32,6 +221,40 @@ class LLMResponse:
     selected_index: int
     reasoning: str
     notify_user: bool
+    confidence: Optional[float] = None  # Only asked of the smaller models in a cascade
+
+    @staticmethod
+    def json_schema(indices: list[int], confidence: bool = False) -> dict:
+        """JSON schema for Ollama structured output, with selected_index limited to the indices in the prompt"""
+        schema = {
+            "type": "object",
+            "properties": {
+                "selected_index": {"type": "integer", "enum": list(indices)},
+                "reasoning": {"type": "string"},
+                "notify_user": {"type": "boolean"},
+            },
+            "required": ["selected_index", "reasoning", "notify_user"],
+        }
+        if confidence:
+            schema["properties"]["confidence"] = {"type": "number", "minimum": 0, "maximum": 1}
+            schema["required"].append("confidence")
+        return schema
+
+    @staticmethod
+    def batch_schema(sizes: list[int]) -> dict:
+        """JSON schema for one selection per schedule; indices are checked per schedule after parsing"""
+        return {
+            "type": "object",
+            "properties": {
+                "selections": {
+                    "type": "array",
+                    "items": LLMResponse.json_schema(range(max(sizes))),
+                    "minItems": len(sizes),
+                    "maxItems": len(sizes),
+                },
+            },
+            "required": ["selections"],
+        }
 
     @classmethod
     def from_dict(cls, data: dict) -> "LLMResponse":
@@ -40,4 +263,5 @@ class LLMResponse:
             selected_index=data["selected_index"],
             reasoning=data["reasoning"],
             notify_user=data.get("notify_user", False),
+            confidence=data.get("confidence"),
         )
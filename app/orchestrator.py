@@ -0,0 +1,540 @@
+"""
+Booking pipelines: the overlapped asyncio pipeline, the sequential sync one,
+multi-date booking, window-open sniping and availability monitoring
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+import requests
+
+from app.config import Config
+from app.models import OPEN_GYM, BookingResult, ClassInfo, LLMResponse
+from app.utils.date import format_date_for_wodify, get_human_readable_date
+from app.services.api_client import (
+    ApiContract,
+    ContractChangedError,
+    ReservationFailedError,
+    SessionExpiredError,
+    WodifyApiClient,
+)
+from app.services.browser import BrowserService
+from app.services.browser_async import AsyncBrowserService
+from app.services.llm import LLMService
+from app.services.monitor import AvailabilityMonitor
+from app.services.notification import NotificationService
+from app.services.server_clock import ServerClock
+from app.services.streaming import PendingSelection
+from app.services.session_store import SessionStore
+
+
+def start_selection(
+    logger: logging.Logger, llm_service: LLMService, classes: list[ClassInfo]
+) -> tuple[ClassInfo, PendingSelection]:
+    """Log the class list and return the chosen class as soon as it is known (reasoning may still be streaming)"""
+    if not classes:
+        raise Exception("No classes found for the target date")
+
+    logger.info(f"Found {len(classes)} classes:")
+    for cls in classes:
+        logger.info(f"  {cls.to_display_string()}")
+
+    logger.info("Consulting LLM for class selection...")
+    pending = llm_service.begin_select(classes)
+
+    selected_class = classes[pending.decision()]
+    logger.info(f"Selected: {selected_class.class_name} at {selected_class.time_range}")
+    return selected_class, pending
+
+
+def select_class(
+    logger: logging.Logger, llm_service: LLMService, classes: list[ClassInfo]
+) -> tuple[ClassInfo, LLMResponse]:
+    """Log the class list and ask the LLM which one to book"""
+    selected_class, pending = start_selection(logger, llm_service, classes)
+    llm_response = pending.result()
+    logger.info(f"Reason: {llm_response.reasoning}")
+    return selected_class, llm_response
+
+
+def send_notifications(
+    logger: logging.Logger, notification: NotificationService, selected_class: ClassInfo, llm_response: LLMResponse
+):
+    """Notify the user if the selection was unusual"""
+    if llm_response.notify_user:
+        logger.info("Sending notification (unusual selection)")
+        notification.notify_unusual_selection(
+            class_name=selected_class.class_name,
+            time_range=selected_class.time_range,
+            reasoning=llm_response.reasoning,
+        )
+    else:
+        logger.info("No notification needed (standard booking)")
+
+
+def book_via_api(
+    logger: logging.Logger, llm_service: LLMService, target_date: datetime
+) -> Optional[tuple[ClassInfo, LLMResponse]]:
+    """
+    Book over plain HTTP using the saved session and recorded API requests
+
+    Returns:
+        (selected_class, llm_response), or None if the browser flow is needed
+    """
+    contract = ApiContract.load()
+    if not contract.is_complete():
+        logger.info("API requests not recorded yet, using browser")
+        return None
+
+    session_store = SessionStore(logger, Config.WODIFY_EMAIL)
+    storage_state = session_store.load()
+    if storage_state is None:
+        return None
+
+    client = WodifyApiClient(logger, storage_state, contract)
+    try:
+        logger.info("Fetching class list over HTTP...")
+        classes = client.fetch_classes(target_date)
+        selected_class, llm_response = select_class(logger, llm_service, classes)
+
+        logger.info("Booking selected class over HTTP...")
+        client.reserve(selected_class)
+        session_store.record_hit()
+        return selected_class, llm_response
+
+    except SessionExpiredError as e:
+        logger.info(f"Saved session rejected ({e}), using browser")
+        session_store.record_expired()
+        return None
+
+    except ContractChangedError as e:
+        logger.warning(f"API contract changed ({e}), using browser")
+        return None
+
+    except ReservationFailedError as e:
+        logger.warning(f"Reservation over HTTP was not accepted ({e}), using browser")
+        return None
+
+    except requests.RequestException as e:
+        logger.warning(f"HTTP request failed ({e}), using browser")
+        return None
+
+    finally:
+        client.close()
+
+
+def book_via_browser(
+    logger: logging.Logger, llm_service: LLMService, target_date_str: str
+) -> tuple[ClassInfo, LLMResponse]:
+    """Log in, scrape the calendar and book through the sync Playwright API"""
+    with BrowserService(logger) as browser:
+        # Step 1: Login
+        logger.info("Step 1: Logging in to Wodify...")
+        browser.login()
+
+        # Step 2: Navigate to calendar
+        logger.info("Step 2: Opening Class Calendar...")
+        browser.navigate_to_calendar()
+
+        # Step 3: Select target date
+        logger.info(f"Step 3: Selecting date {target_date_str}...")
+        browser.select_date(target_date_str)
+
+        # Step 4: Extract classes
+        logger.info("Step 4: Extracting class list...")
+        classes = browser.extract_classes()
+
+        # Step 5: LLM selection (booking starts as soon as the index is known)
+        logger.info("Step 5: Selecting class...")
+        selected_class, pending = start_selection(logger, llm_service, classes)
+
+        # Step 6: Book the class
+        logger.info("Step 6: Booking selected class...")
+        browser.book_class(selected_class)
+
+        return selected_class, pending.result()
+
+
+def run_sync(logger: logging.Logger, target_date: datetime, target_date_str: str) -> int:
+    """
+    Sequential pipeline: each step waits for the previous one
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    notification = NotificationService(logger)
+    llm_service = LLMService(logger)
+    llm_service.start_warm_up()
+
+    try:
+        result = None
+        if Config.BOOKING_BACKEND == "api":
+            result = book_via_api(logger, llm_service, target_date)
+        if result is None:
+            result = book_via_browser(logger, llm_service, target_date_str)
+        selected_class, llm_response = result
+
+        # Step 7: Notifications
+        logger.info("Step 7: Handling notifications...")
+        send_notifications(logger, notification, selected_class, llm_response)
+
+        logger.info("=" * 60)
+        logger.info("✓ SUCCESS: Class booked successfully")
+        logger.info("=" * 60)
+        return 0
+
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error(f"❌ ERROR: {str(e)}")
+        logger.error("=" * 60)
+
+        # Send error notification
+        notification.notify_error(str(e))
+
+        return 1
+
+    finally:
+        llm_service.release()
+
+
+async def prepare_llm(logger: logging.Logger) -> LLMService:
+    """Build the LLM service off the event loop and start warming the Ollama model"""
+    llm_service = await asyncio.to_thread(LLMService, logger)
+    llm_service.start_warm_up()
+    return llm_service
+
+
+async def release_llm(llm_task: asyncio.Task):
+    """Cancel LLM preparation if it is still running, otherwise release the model"""
+    if not llm_task.done():
+        llm_task.cancel()
+    elif not llm_task.cancelled() and llm_task.exception() is None:
+        await asyncio.to_thread(llm_task.result().release)
+
+
+async def run_async(logger: logging.Logger, target_date: datetime, target_date_str: str) -> int:
+    """
+    Overlapped pipeline
+
+    The LLM service is built and the Ollama model warmed up while the browser
+    starts and logs in; notifications are sent while the browser shuts down.
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    notification = NotificationService(logger)
+    llm_task = asyncio.create_task(prepare_llm(logger))
+    notify_task: Optional[asyncio.Task] = None
+    exit_code = 1
+
+    try:
+        result = None
+        if Config.BOOKING_BACKEND == "api":
+            result = await asyncio.to_thread(book_via_api, logger, await llm_task, target_date)
+
+        if result is None:
+            async with AsyncBrowserService(logger) as browser:
+                logger.info("Step 1: Logging in to Wodify...")
+                await browser.login()
+
+                logger.info("Step 2: Opening Class Calendar...")
+                await browser.navigate_to_calendar()
+
+                logger.info(f"Step 3: Selecting date {target_date_str}...")
+                await browser.select_date(target_date_str)
+
+                logger.info("Step 4: Extracting class list...")
+                classes = await browser.extract_classes()
+
+                logger.info("Step 5: Selecting class...")
+                llm_service = await llm_task
+                selected_class, pending = await asyncio.to_thread(start_selection, logger, llm_service, classes)
+
+                logger.info("Step 6: Booking selected class...")
+                await browser.book_class(selected_class)
+                llm_response = await asyncio.to_thread(pending.result)
+                result = selected_class, llm_response
+
+                # Notify while the browser closes
+                logger.info("Step 7: Handling notifications...")
+                notify_task = asyncio.create_task(
+                    asyncio.to_thread(send_notifications, logger, notification, selected_class, llm_response)
+                )
+        else:
+            logger.info("Step 7: Handling notifications...")
+            notify_task = asyncio.create_task(asyncio.to_thread(send_notifications, logger, notification, *result))
+
+        logger.info("=" * 60)
+        logger.info("✓ SUCCESS: Class booked successfully")
+        logger.info("=" * 60)
+        exit_code = 0
+
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error(f"❌ ERROR: {str(e)}")
+        logger.error("=" * 60)
+
+        notify_task = asyncio.create_task(asyncio.to_thread(notification.notify_error, str(e)))
+
+    finally:
+        await release_llm(llm_task)
+        if notify_task:
+            try:
+                await asyncio.wait_for(notify_task, timeout=15)
+            except Exception as e:
+                logger.warning(f"Notification did not complete: {e}")
+
+    return exit_code
+
+
+async def run_multi_date(logger: logging.Logger, target_dates: list[datetime]) -> int:
+    """
+    Book several dates with one login
+
+    The first date loads in the logged-in tab; every other date gets its
+    own tab in the same browser context, sharing its cookies. All tabs are
+    driven from the one browser thread, their steps interleaved, so one
+    tab's page keeps loading while another is being read. Each day's
+    selection is then booked in its tab. With LLM_BATCH every day is
+    selected in one LLM call.
+
+    Returns:
+        Exit code (0 if every date was booked, 1 otherwise)
+    """
+    notification = NotificationService(logger)
+    llm_task = asyncio.create_task(prepare_llm(logger))
+    results = [
+        BookingResult(date_str=format_date_for_wodify(d), human_date=get_human_readable_date(d)) for d in target_dates
+    ]
+    tabs: list[AsyncBrowserService] = []
+    run_start = time.perf_counter()
+
+    async def load_date(browser: AsyncBrowserService, result: BookingResult, first: bool):
+        start = time.perf_counter()
+        if first:
+            tab = browser
+        else:
+            tab = await browser.new_tab()
+            tabs.append(tab)
+        await tab.navigate_to_calendar()
+        await tab.select_date(result.date_str)
+        classes = await tab.extract_classes()
+        result.elapsed_ms += (time.perf_counter() - start) * 1000
+        return tab, classes
+
+    async def book_date(
+        tab: AsyncBrowserService,
+        result: BookingResult,
+        classes: list[ClassInfo],
+        llm_response: Optional[LLMResponse] = None,
+    ):
+        start = time.perf_counter()
+        try:
+            if llm_response:
+                result.selected, result.llm_response = classes[llm_response.selected_index], llm_response
+                logger.info(f"{result.human_date}: selected {result.selected.class_name} at {result.selected.time_range}")
+            else:
+                llm_service = await llm_task
+                result.selected, result.llm_response = await asyncio.to_thread(
+                    select_class, logger, llm_service, classes
+                )
+            await tab.book_class(result.selected)
+        except Exception as e:
+            result.error = str(e)
+        result.elapsed_ms += (time.perf_counter() - start) * 1000
+
+    try:
+        async with AsyncBrowserService(logger) as browser:
+            try:
+                logger.info("Logging in to Wodify...")
+                await browser.login()
+
+                logger.info(f"Loading {len(results)} dates in browser tabs...")
+                loaded = await asyncio.gather(
+                    *(load_date(browser, result, i == 0) for i, result in enumerate(results)),
+                    return_exceptions=True,
+                )
+
+                ready = []
+                for result, outcome in zip(results, loaded):
+                    if isinstance(outcome, Exception):
+                        result.error = str(outcome)
+                    else:
+                        ready.append((result, *outcome))
+
+                responses = [None] * len(ready)
+                schedules = [classes for _, _, classes in ready]
+                if Config.LLM_BATCH and len(ready) > 1 and all(schedules):
+                    try:
+                        llm_service = await llm_task
+                        responses = await asyncio.to_thread(llm_service.select_batch, schedules)
+                    except Exception as e:
+                        logger.warning(f"Batch selection failed ({e}), selecting each date separately")
+
+                await asyncio.gather(
+                    *(
+                        book_date(tab, result, classes, response)
+                        for (result, tab, classes), response in zip(ready, responses)
+                    )
+                )
+            finally:
+                await asyncio.gather(*(tab.close() for tab in tabs), return_exceptions=True)
+
+    except Exception as e:
+        for result in results:
+            if result.selected is None and result.error is None:
+                result.error = str(e)
+
+    finally:
+        await release_llm(llm_task)
+
+    total_ms = (time.perf_counter() - run_start) * 1000
+    logger.info("=" * 60)
+    logger.info(f"Multi-date report ({len(results)} dates, {total_ms / 1000:.1f}s total):")
+    for result in results:
+        logger.info(f"  {result.to_report_line()}  ({result.elapsed_ms:.0f}ms)")
+    logger.info("=" * 60)
+
+    failed = [r for r in results if not r.succeeded]
+    unusual = [r for r in results if r.succeeded and r.llm_response.notify_user]
+    if failed or unusual:
+        report = "\n".join(r.to_report_line() for r in failed + unusual)
+        await asyncio.to_thread(notification.notify_report, report, bool(failed))
+
+    return 1 if failed else 0
+
+
+def rank_candidates(classes: list[ClassInfo], first_choice: ClassInfo) -> list[ClassInfo]:
+    """
+    First choice, then the fallbacks in the prompt's order of preference
+
+    Other classes before OPEN GYM, each group ordered by how far its start
+    is from the first choice's; classes with an unreadable time go last.
+    """
+    def preference(c: ClassInfo) -> tuple:
+        timed = c.start is not None and first_choice.start is not None
+        return (c.category == OPEN_GYM, c.start is None, abs(c.start - first_choice.start) if timed else 0, c.index)
+
+    others = [c for c in classes if c.index != first_choice.index]
+    return [first_choice] + sorted(others, key=preference)
+
+
+def run_snipe(logger: logging.Logger, target_date_str: str) -> int:
+    """
+    Book at the exact instant the reservation window opens
+
+    Logs in and loads the target date ahead of time, ranks candidates with
+    the LLM and locates their booking buttons, then waits on the monotonic
+    clock (synchronised against the server's Date header) and, from
+    SNIPE_AT, polls those buttons and clicks the first that opens.
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    notification = NotificationService(logger)
+    llm_service = LLMService(logger)
+    llm_service.start_warm_up()
+    clock = ServerClock(logger)
+
+    try:
+        open_at = datetime.combine(datetime.now().date(), datetime.strptime(Config.SNIPE_AT, "%H:%M:%S").time())
+        open_epoch = open_at.timestamp()
+
+        with BrowserService(logger) as browser:
+            logger.info("Pre-positioning: login, calendar and class ranking...")
+            try:
+                browser.login()
+                browser.navigate_to_calendar()
+                browser.select_date(target_date_str)
+                classes = browser.extract_classes()
+                first_choice, llm_response = select_class(logger, llm_service, classes)
+            finally:
+                llm_service.release()
+            buttons = browser.resolve_book_buttons(rank_candidates(classes, first_choice))
+            if not buttons:
+                raise Exception("No booking button found for any candidate class")
+
+            clock.sync()
+            if open_epoch - clock.server_time() > Config.SNIPE_RESYNC_SECONDS:
+                logger.info(f"Waiting {open_epoch - clock.server_time():.0f}s for {Config.SNIPE_AT}...")
+                clock.wait_until(open_epoch - Config.SNIPE_RESYNC_SECONDS)
+                clock.sync()
+            if open_epoch < clock.server_time():
+                logger.warning(f"Window opened at {Config.SNIPE_AT} already, booking immediately")
+
+            clock.wait_until(open_epoch)
+            fired = time.monotonic()
+            logger.info(f"Window open (server time lag {(clock.server_time() - open_epoch) * 1000:+.1f}ms)")
+
+            booked = browser.book_first_open(buttons, Config.SNIPE_POLL_SECONDS)
+            done = time.monotonic()
+
+            click_ms = (browser.last_click_at - fired) * 1000
+            logger.info(f"Click latency {click_ms:.1f}ms, end-to-end {(done - fired) * 1000:.0f}ms")
+
+        if booked.index != first_choice.index:
+            notification.notify_unusual_selection(
+                class_name=booked.class_name,
+                time_range=booked.time_range,
+                reasoning=f"First choice {first_choice.class_name} could not be booked; took the nearest alternative.",
+            )
+        else:
+            send_notifications(logger, notification, booked, llm_response)
+
+        logger.info("=" * 60)
+        logger.info("✓ SUCCESS: Class booked at window open")
+        logger.info("=" * 60)
+        return 0
+
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error(f"❌ ERROR: {str(e)}")
+        logger.error("=" * 60)
+        notification.notify_error(str(e))
+        return 1
+
+
+def run_monitor(logger: logging.Logger, target_date: datetime, target_date_str: str) -> int:
+    """
+    Book the chosen class, waiting for a spot if it is full
+
+    Returns:
+        Exit code (0 for success, 1 for failure)
+    """
+    notification = NotificationService(logger)
+    llm_service = LLMService(logger)
+    llm_service.start_warm_up()
+
+    try:
+        with BrowserService(logger) as browser:
+            browser.login()
+            browser.navigate_to_calendar()
+            browser.select_date(target_date_str)
+            classes = browser.extract_classes()
+            selected, llm_response = select_class(logger, llm_service, classes)
+            llm_service.release()
+
+            if selected.is_bookable():
+                browser.book_class(selected)
+            else:
+                logger.info(f"{selected.class_name} is not bookable ({selected.button_text}), monitoring for a spot")
+                monitor = AvailabilityMonitor(logger, browser)
+                if monitor.watch(target_date, target_date_str, [selected]) is None:
+                    raise Exception(f"No spot opened in {selected.class_name} at {selected.time_range}")
+
+        send_notifications(logger, notification, selected, llm_response)
+
+        logger.info("=" * 60)
+        logger.info("✓ SUCCESS: Class booked")
+        logger.info("=" * 60)
+        return 0
+
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error(f"❌ ERROR: {str(e)}")
+        logger.error("=" * 60)
+        notification.notify_error(str(e))
+        return 1
@@ -0,0 +1,247 @@
+"""Browserless booking client that replays Wodify's calendar and reservation requests"""
+
+import re
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.models import ClassInfo
+from app.config import Config
+from app.services.calendar_feed import parse_payload, filter_by_date
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+class ContractChangedError(Exception):
+    """The API no longer answers the way the recorded contract expects"""
+
+
+class SessionExpiredError(Exception):
+    """The reused session cookies were rejected"""
+
+
+class ReservationFailedError(Exception):
+    """The reservation request went through but Wodify did not book the class"""
+
+
+def _replace_value(obj: Any, old: str, new: str, prefix: bool = False) -> Any:
+    """Deep-replace values equal to `old` (or, with prefix=True, starting with it) in a JSON structure"""
+    if isinstance(obj, dict):
+        return {k: _replace_value(v, old, new, prefix) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_replace_value(v, old, new, prefix) for v in obj]
+    if isinstance(obj, bool):
+        return obj
+    if isinstance(obj, int) and str(obj) == old:
+        return int(new) if new.isdigit() else new
+    if isinstance(obj, str) and (obj == old or (prefix and obj.startswith(old))):
+        return new + obj[len(old):]
+    return obj
+
+
+def _find_value(obj: Any, predicate) -> Optional[str]:
+    """Find the first string value in a JSON structure matching `predicate`"""
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, list):
+        for value in obj:
+            found = _find_value(value, predicate)
+            if found is not None:
+                return found
+        return None
+    if isinstance(obj, (str, int)) and not isinstance(obj, bool) and predicate(str(obj)):
+        return str(obj)
+    return None
+
+
+class ApiContract:
+    """
+    Recorded request templates for the calendar fetch and reservation calls
+
+    Templates are captured from real browser traffic by BrowserService, with
+    the date (calendar) or class id (reservation) marked as the variable
+    part. Cookies are never stored here; they come from the session store.
+    """
+
+    FILE_NAME = "api_contract.json"
+
+    def __init__(self, calendar: Optional[dict] = None, reservation: Optional[dict] = None):
+        self.calendar = calendar
+        self.reservation = reservation
+
+    @classmethod
+    def path(cls) -> Path:
+        return Config.SESSION_DIR / cls.FILE_NAME
+
+    @classmethod
+    def load(cls) -> "ApiContract":
+        """Load the recorded contract (empty if none recorded yet)"""
+        try:
+            data = json.loads(cls.path().read_text())
+        except (OSError, ValueError):
+            return cls()
+        return cls(calendar=data.get("calendar"), reservation=data.get("reservation"))
+
+    def save(self):
+        Config.SESSION_DIR.mkdir(parents=True, exist_ok=True)
+        self.path().write_text(json.dumps({"calendar": self.calendar, "reservation": self.reservation}, indent=2))
+
+    def is_complete(self) -> bool:
+        return bool(self.calendar and self.reservation)
+
+    @staticmethod
+    def _template(url: str, body: Any, headers: dict, variable: str, prefix: bool) -> dict:
+        kept_headers = {
+            k: v for k, v in headers.items() if k.lower().startswith(("x-", "outsystems")) and k.lower() != "x-csrftoken"
+        }
+        return {"url": url, "body": body, "headers": kept_headers, "variable": variable, "prefix": prefix}
+
+    def record_calendar(self, url: str, body: Any, headers: dict, date_str: str) -> bool:
+        """
+        Record the calendar fetch request for an "M/D" date
+
+        Returns:
+            True if the date could be located in the request body
+        """
+        month, day = (int(part) for part in date_str.split("/"))
+
+        def is_target_date(value: str) -> bool:
+            if not ISO_DATE.match(value):
+                return False
+            parsed = datetime.strptime(value[:10], "%Y-%m-%d")
+            return (parsed.month, parsed.day) == (month, day)
+
+        date_value = _find_value(body, is_target_date)
+        if date_value is None:
+            return False
+        self.calendar = self._template(url, body, headers, date_value[:10], prefix=True)
+        return True
+
+    def record_reservation(self, url: str, body: Any, headers: dict, class_id: str) -> bool:
+        """
+        Record the reservation request for a class id
+
+        Returns:
+            True if the class id could be located in the request body
+        """
+        if _find_value(body, lambda value: value == class_id) is None:
+            return False
+        self.reservation = self._template(url, body, headers, class_id, prefix=False)
+        return True
+
+
+class WodifyApiClient:
+    """
+    Books classes over plain HTTP using cookies captured by BrowserService
+
+    One pooled requests.Session is reused for every call, so a booking is a
+    calendar POST plus a reservation POST over the same connection.
+    """
+
+    def __init__(self, logger: logging.Logger, storage_state: dict, contract: ApiContract):
+        self.logger = logger
+        self.contract = contract
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+
+        for cookie in storage_state.get("cookies", []):
+            self.session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/")
+            )
+
+    def close(self):
+        self.session.close()
+
+    def _csrf_token(self) -> Optional[str]:
+        """OutSystems keeps the CSRF token inside the nr2Users cookie ("crf=<token>;...")"""
+        for cookie in self.session.cookies:
+            if cookie.name.startswith("nr2"):
+                match = re.search(r"crf=([^;]+)", unquote(cookie.value))
+                if match:
+                    return match.group(1)
+        return None
+
+    def _post(self, template: dict, new: str) -> Any:
+        body = _replace_value(template["body"], template["variable"], new, template["prefix"])
+        headers = dict(template["headers"])
+        token = self._csrf_token()
+        if token:
+            headers["X-CSRFToken"] = token
+
+        response = self.session.post(
+            template["url"], json=body, headers=headers, timeout=Config.PAGE_LOAD_TIMEOUT / 1000
+        )
+        if response.status_code in (401, 403):
+            raise SessionExpiredError(f"HTTP {response.status_code} from {template['url']}")
+        if response.status_code != 200:
+            raise ContractChangedError(f"HTTP {response.status_code} from {template['url']}")
+        try:
+            payload = response.json()
+        except ValueError:
+            raise ContractChangedError(f"Non-JSON response from {template['url']}")
+
+        # OutSystems reports version mismatches and logouts in-band
+        if isinstance(payload, dict):
+            exception = payload.get("exception") or {}
+            name = str(exception.get("name", ""))
+            if "NotRegistered" in name or "Security" in name:
+                raise SessionExpiredError(name)
+            if exception or payload.get("versionInfo", {}).get("hasModuleVersionChanged"):
+                raise ContractChangedError(name or "Module version changed")
+        return payload
+
+    def fetch_classes(self, date: datetime) -> list[ClassInfo]:
+        """
+        Fetch the class list for a date
+
+        Raises:
+            ContractChangedError: The calendar request or payload shape changed
+            SessionExpiredError: The session cookies were rejected
+        """
+        if not self.contract.calendar:
+            raise ContractChangedError("No recorded calendar request")
+        template = self.contract.calendar
+        payload = self._post(template, date.strftime("%Y-%m-%d"))
+
+        classes = parse_payload(payload)
+        if classes is None:
+            raise ContractChangedError("Calendar payload not recognised")
+        if all(c.start_date for c in classes):
+            classes = filter_by_date(classes, f"{date.month}/{date.day}")
+        self.logger.info(f"Fetched {len(classes)} classes over HTTP")
+        return classes
+
+    def reserve(self, class_info: ClassInfo) -> Any:
+        """
+        Reserve a class by id
+
+        Raises:
+            ContractChangedError: The reservation request or response shape changed, or the class has no id
+            SessionExpiredError: The session cookies were rejected
+            ReservationFailedError: Wodify answered without booking the class (e.g. it is full)
+        """
+        if not self.contract.reservation:
+            raise ContractChangedError("No recorded reservation request")
+        if not class_info.class_id:
+            raise ContractChangedError(f"No class id for {class_info.class_name}")
+        template = self.contract.reservation
+        payload = self._post(template, class_info.class_id)
+
+        data = payload.get("data") if isinstance(payload, dict) else None
+        if not isinstance(data, dict) or "Success" not in data:
+            raise ContractChangedError(f"No Success flag in the response from {template['url']}")
+        if not data["Success"]:
+            message = data.get("Message") or data.get("ErrorMessage") or "no reason given"
+            raise ReservationFailedError(f"{class_info.class_name} at {class_info.time_range}: {message}")
+        self.logger.info(f"✓ Reserved {class_info.class_name} at {class_info.time_range} over HTTP")
+        return payload
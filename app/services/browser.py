@@ -1,22 +1,73 @@
 """Browser automation service using Playwright"""
 
 import re
+import time
 import logging
 from typing import Optional
-from playwright.sync_api import sync_playwright, Browser, Page, Playwright
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Locator, Page, Playwright
 
-from app.models import ClassInfo
+from app.models import BOOKABLE, ClassInfo, booking_state
 from app.config import Config
+from app.services.api_client import ApiContract
+from app.services.calendar_feed import CalendarFeed
+from app.services.date_navigator import DateNavigator
+from app.services.flight_recorder import FlightRecorder, recorded_step
+from app.services.resource_filter import ResourceFilter
+from app.services.session_store import SessionStore
+from app.services.waits import PageWaiter
+from app.utils.timing import timed_step
+
+CLASS_ROW_SELECTOR = ".list-item[data-list-item]"
+EMAIL_INPUT_SELECTOR = "input[type='email'], input#Input_UserName2"
+
+# Reads every class row in one page.evaluate call. Mirrors the per-row
+# locators in _extract_classes_locator so both paths return the same data.
+EXTRACT_CLASSES_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((row) => {
+    const text = (el) => (el ? el.innerText : "");
+    const timeLeft = row.querySelector(".list-item-content-left");
+    const button = row.querySelector("button");
+    return {
+        time_range: text(timeLeft).split("\\n")[0],
+        class_name: text(row.querySelector(".font-size-m span")),
+        coach: text(row.querySelector("a[href='#']")),
+        button_id: button ? button.getAttribute("id") : null,
+        button_text: text(button),
+    };
+})
+"""
 
 
 class BrowserService:
     """Handles all Playwright browser automation for Wodify"""
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, owner: Optional["BrowserService"] = None):
         self.logger = logger
+        self.owner = owner  # Service whose browser context this tab shares (None: owns the browser)
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.browser_mode = "local"
         self.page: Optional[Page] = None
+        self.waiter: Optional[PageWaiter] = None
+        self.date_navigator: Optional[DateNavigator] = None
+        self.calendar_feed = CalendarFeed(logger)
+        self.feed_classes: Optional[list[ClassInfo]] = None
+        self.current_date_str: Optional[str] = None
+        self.resource_filter = ResourceFilter(logger)
+        self.recorder = FlightRecorder(logger)
+        self.step_timings: dict[str, float] = {}
+        self.last_click_at: Optional[float] = None  # time.monotonic() of the last book-button click
+        self.session_store: Optional[SessionStore] = None
+        self.session_restored = False
+
+        if owner:
+            self.playwright, self.browser, self.context = owner.playwright, owner.browser, owner.context
+            self.browser_mode = owner.browser_mode
+            self.resource_filter = owner.resource_filter
+            self.recorder = owner.recorder
+        elif Config.SESSION_REUSE and Config.WODIFY_EMAIL:
+            self.session_store = SessionStore(logger, Config.WODIFY_EMAIL)
 
     def __enter__(self):
         """Context manager entry"""
@@ -27,31 +78,130 @@ class BrowserService:
         """Context manager exit"""
         self.close()
 
+    def connect_remote(self) -> Optional[Browser]:
+        """
+        Connect to a long-lived browser server if one is configured
+
+        Tries BROWSER_WS_ENDPOINT (playwright run-server / launch_server) first,
+        then BROWSER_CDP_ENDPOINT. Returns None when neither is configured or
+        the server fails its health check.
+        """
+        endpoints = [
+            ("ws", Config.BROWSER_WS_ENDPOINT, self.playwright.chromium.connect),
+            ("cdp", Config.BROWSER_CDP_ENDPOINT, self.playwright.chromium.connect_over_cdp),
+        ]
+        for mode, endpoint, connect in endpoints:
+            if not endpoint:
+                continue
+            try:
+                browser = connect(endpoint, timeout=Config.BROWSER_CONNECT_TIMEOUT)
+                if not browser.is_connected():
+                    raise Exception("connection dropped")
+                self.logger.info(f"Connected to browser server at {endpoint} (Chromium {browser.version})")
+                self.browser_mode = mode
+                return browser
+            except Exception as e:
+                self.logger.warning(f"Browser server at {endpoint} unavailable: {e}")
+        return None
+
     def start(self):
-        """Start the browser"""
+        """Start the browser (or connect to a browser server) and open a fresh context"""
         self.logger.info("Starting browser...")
+        start = time.perf_counter()
         self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=Config.HEADLESS,
-            args=["--no-sandbox", "--disable-blink-features=AutomationControlled"],
-        )
+        self.browser = self.connect_remote()
+        if self.browser is None:
+            self.browser_mode = "local"
+            self.browser = self.playwright.chromium.launch(
+                headless=Config.HEADLESS,
+                args=["--no-sandbox", "--disable-blink-features=AutomationControlled"],
+            )
+        self.step_timings["browser_start"] = (time.perf_counter() - start) * 1000
+        self.logger.info(f"Browser ready in {self.step_timings['browser_start']:.0f}ms ({self.browser_mode})")
 
-        context = self.browser.new_context(
+        storage_state = self.session_store.load() if self.session_store else None
+        self.session_restored = storage_state is not None
+
+        self.context = self.browser.new_context(
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             viewport={"width": 1440, "height": 900},
+            storage_state=storage_state,
         )
+        self.resource_filter.install(self.context)
 
-        self.page = context.new_page()
+        self.open_page()
         self.logger.info("Browser started successfully")
 
+    def open_page(self):
+        """Open this service's page in the browser context, with its own waiter, date navigator and feed"""
+        self.page = self.context.new_page()
+        self.page.set_default_timeout(Config.ELEMENT_WAIT_TIMEOUT)
+        self.page.set_default_navigation_timeout(Config.PAGE_LOAD_TIMEOUT)
+        self.waiter = PageWaiter(self.page, self.logger)
+        self.date_navigator = DateNavigator(self.page, self.logger, self.waiter)
+        self.page.on("response", self.calendar_feed.on_response)
+
+    def new_tab(self) -> "BrowserService":
+        """
+        Another tab in this browser context, sharing its cookies
+
+        Must be called on the thread that started this service. The tab is
+        a BrowserService of its own (select_date, extract_classes and
+        book_class act on its page); close() only closes its page.
+
+        Returns:
+            BrowserService driving the new tab
+        """
+        tab = BrowserService(self.logger, owner=self)
+        tab.open_page()
+        return tab
+
+    @timed_step("open_tab")
+    @recorded_step("open_tab")
+    def resume_session(self):
+        """Load the app shell in this tab, already logged in through the shared context"""
+        self.page.goto(Config.WODIFY_URL, wait_until="domcontentloaded")
+        self.wait_for_logged_in()
+
     def close(self):
         """Close the browser and cleanup"""
-        if self.browser:
+        if self.waiter:
+            self.waiter.report()
+        if self.date_navigator:
+            self.date_navigator.report()
+        if self.owner:
+            # A tab: the browser and context belong to the owner
+            if self.page:
+                self.page.close()
+            return
+        self.report_step_timings()
+        self.logger.debug(
+            f"Flight recorder: {len(self.recorder.snapshots)} snapshots buffered, {self.recorder.capture_ms:.0f}ms capturing"
+        )
+        self.resource_filter.report()
+        if self.session_store:
+            stats = self.session_store.stats()
+            self.logger.info(
+                f"Session store: {stats['hits']} hits, {stats['misses']} misses, {stats['expired']} expired"
+            )
+        if self.browser and self.browser_mode != "local":
+            # Shared browser server: only drop our context, leave the server running
+            if self.context:
+                self.logger.info("Closing browser context...")
+                self.context.close()
+        elif self.browser:
             self.logger.info("Closing browser...")
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
 
+    def report_step_timings(self):
+        """Log per-page timings, tagged with the resource filter mode for before/after comparison"""
+        if not self.step_timings:
+            return
+        timings = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.step_timings.items())
+        self.logger.info(f"Page timings (resource filter: {self.resource_filter.mode}): {timings}")
+
     def attempt_login(self) -> bool:
         """
         Attempt to login to Wodify
@@ -60,7 +210,7 @@ class BrowserService:
             True if login successful, False otherwise
         """
         # New flow (2024+): Email on homepage, then CONTINUE, then password
-        email_input = self.page.locator("input[type='email'], input#Input_UserName2")
+        email_input = self.page.locator(EMAIL_INPUT_SELECTOR)
         if email_input.count() > 0 and email_input.first.is_visible():
             self.logger.info("Using new login flow (email on homepage)")
 
@@ -73,14 +223,14 @@ class BrowserService:
                 self.logger.warning("No CONTINUE button found")
                 return False
             continue_btn.click()
-            self.page.wait_for_timeout(3000)
 
             # Step 3: Enter password
-            pwd_field = self.page.locator("input[type='password']")
-            if pwd_field.count() == 0:
+            try:
+                pwd_field = self.waiter.for_visible("input[type='password']", "password field")
+            except Exception:
                 self.logger.warning("No password field found after CONTINUE")
                 return False
-            pwd_field.first.fill(Config.WODIFY_PASSWORD)
+            pwd_field.fill(Config.WODIFY_PASSWORD)
 
             # Step 4: Click Sign in
             signin_btn = self.page.get_by_role("button", name=re.compile("Sign in", re.I))
@@ -88,7 +238,7 @@ class BrowserService:
                 self.logger.warning("No Sign in button found")
                 return False
             signin_btn.click()
-            self.page.wait_for_load_state("networkidle")
+            self.wait_for_logged_in()
 
             self.logger.info("Login successful (new flow)")
             return True
@@ -98,12 +248,12 @@ class BrowserService:
         if login_link.count() > 0:
             self.logger.info("Using old login flow (login link)")
             login_link.first.click()
-            self.page.wait_for_timeout(2000)
 
-            self.page.get_by_role("textbox", name=re.compile("Email", re.I)).fill(Config.WODIFY_EMAIL)
+            email_field = self.page.get_by_role("textbox", name=re.compile("Email", re.I))
+            self.waiter.for_visible(email_field, "login form").fill(Config.WODIFY_EMAIL)
             self.page.get_by_role("textbox", name=re.compile("Password", re.I)).fill(Config.WODIFY_PASSWORD)
             self.page.get_by_role("button", name=re.compile("Sign in", re.I)).click()
-            self.page.wait_for_load_state("networkidle")
+            self.wait_for_logged_in()
 
             self.logger.info("Login successful (old flow)")
             return True
@@ -111,11 +261,72 @@ class BrowserService:
         self.logger.warning("No login method found")
         return False
 
+    def calendar_menu(self):
+        """Locator for the Class Calendar menu item shown once logged in"""
+        return self.page.get_by_role("menuitem", name=re.compile("Class Calendar", re.I))
+
+    def wait_for_logged_in(self):
+        """Wait for the post-login navigation menu to render"""
+        self.waiter.for_visible(self.calendar_menu(), "post-login menu", timeout=Config.PAGE_LOAD_TIMEOUT)
+
+    def wait_for_login_page(self):
+        """Wait until one of the known login entry points is visible"""
+        entry_points = self.page.locator(EMAIL_INPUT_SELECTOR).or_(self.page.get_by_text("Login", exact=False))
+        try:
+            self.waiter.for_visible(entry_points, "login page")
+        except Exception:
+            self.logger.warning("No login entry point became visible")
+
+    def has_valid_session(self) -> bool:
+        """
+        Cheaply check whether the restored session is still logged in
+
+        Loads the app shell and waits for whichever shows up first: the
+        logged-in navigation menu or the login email field.
+
+        Returns:
+            True if the Class Calendar menu is reachable without logging in
+        """
+        self.page.goto(Config.WODIFY_URL, wait_until="domcontentloaded")
+        calendar_menu = self.calendar_menu()
+        email_input = self.page.locator(EMAIL_INPUT_SELECTOR)
+        try:
+            self.waiter.for_visible(calendar_menu.or_(email_input), "session check")
+        except Exception:
+            return False
+        return calendar_menu.count() > 0 and calendar_menu.first.is_visible()
+
+    def save_session(self):
+        """Persist the current context's cookies/localStorage for the next run"""
+        if not self.session_store:
+            return
+        try:
+            self.session_store.save(self.context.storage_state())
+        except Exception as e:
+            self.logger.warning(f"Failed to save session: {e}")
+
+    @timed_step("login")
+    @recorded_step("login")
     def login(self):
+        """Login to Wodify, reusing a saved session when it is still valid"""
+        if self.session_restored:
+            if self.has_valid_session():
+                self.logger.info("Saved session still valid, skipping login")
+                if self.session_store:
+                    self.session_store.record_hit()
+                return
+            self.logger.info("Saved session expired, logging in again")
+            if self.session_store:
+                self.session_store.record_expired()
+
+        self.full_login()
+        self.save_session()
+
+    def full_login(self):
         """Login to Wodify with retry logic"""
         self.logger.info(f"Navigating to {Config.WODIFY_URL}")
-        self.page.goto(Config.WODIFY_URL, wait_until="networkidle")
-        self.page.wait_for_timeout(3000)
+        self.page.goto(Config.WODIFY_URL, wait_until="domcontentloaded")
+        self.wait_for_login_page()
 
         # First attempt
         if self.attempt_login():
@@ -123,37 +334,140 @@ class BrowserService:
 
         # Retry with page refresh
         self.logger.warning("Login failed, refreshing page and retrying...")
-        self.page.reload(wait_until="networkidle")
-        self.page.wait_for_timeout(3000)
+        self.page.reload(wait_until="domcontentloaded")
+        self.wait_for_login_page()
 
         if not self.attempt_login():
             raise Exception("Failed to login after 2 attempts")
 
-    def navigate_to_calendar(self):
-        """Navigate to the Class Calendar"""
+    @timed_step("calendar")
+    @recorded_step("calendar")
+    def navigate_to_calendar(self, timeout: Optional[int] = None):
+        """
+        Navigate to the Class Calendar
+
+        Args:
+            timeout: Deadline in ms for the calendar data (default: Config.PAGE_LOAD_TIMEOUT)
+        """
         self.logger.info("Opening Class Calendar...")
-        self.page.get_by_role("menuitem", name=re.compile("Class Calendar", re.I)).click()
-        self.page.wait_for_timeout(Config.CALENDAR_LOAD_WAIT)
+        self.click_and_wait_for_calendar(self.calendar_menu(), "calendar", timeout=timeout)
         self.logger.info("Class Calendar opened")
 
-    def select_date(self, date_str: str):
+    @timed_step("select_date")
+    @recorded_step("select_date")
+    def select_date(self, date_str: str, timeout: Optional[int] = None):
         """
         Select a specific date in the calendar
 
         Args:
             date_str: Date string in "M/D" format (e.g., "11/14")
+            timeout: Deadline in ms for the class list (default: Config.PAGE_LOAD_TIMEOUT)
         """
         self.logger.info(f"Selecting date: {date_str}")
-        date_pattern = f".*{re.escape(date_str)}$"
-        date_elements = self.page.locator("div").filter(has_text=re.compile(date_pattern)).all()
+        tile = self.date_navigator.locate(date_str)
+        self.click_and_wait_for_calendar(tile, f"date {date_str}", date_str, timeout)
+        self.logger.info(f"Clicked on {date_str}")
+
+        self.current_date_str = date_str
+        if Config.BOOKING_BACKEND == "api":
+            self.record_calendar_contract(date_str)
+
+    @timed_step("refresh_date")
+    @recorded_step("refresh_date")
+    def refresh_date(self, date_str: str, timeout: Optional[int] = None):
+        """
+        Reload the page and select a date again, so its class list is fetched afresh
+
+        Re-clicking the date tile that is already selected may not refetch
+        the list at all.
+
+        Args:
+            date_str: Date string in "M/D" format
+            timeout: Deadline in ms for each calendar data wait (default: Config.PAGE_LOAD_TIMEOUT)
+        """
+        self.page.reload(wait_until="domcontentloaded")
+        self.navigate_to_calendar(timeout)
+        self.select_date(date_str, timeout)
+
+    def record_calendar_contract(self, date_str: str):
+        """Record the calendar data request so WodifyApiClient can replay it"""
+        if not self.calendar_feed.classes_for(date_str) or not self.calendar_feed.last_match:
+            self.logger.debug("No recognisable calendar request to record")
+            return
+        request = self.calendar_feed.last_match.request
+        contract = ApiContract.load()
+        if contract.record_calendar(request.url, request.post_data_json, request.headers, date_str):
+            contract.save()
+            self.logger.info("Recorded calendar API request")
+
+    def record_reservation_contract(self, class_info: ClassInfo, since: int):
+        """Record the reservation request made while booking `class_info`"""
+        class_id = class_info.class_id
+        if not class_id and self.current_date_str:
+            feed_classes = self.calendar_feed.classes_for(self.current_date_str) or []
+            matches = [
+                c.class_id for c in feed_classes
+                if c.class_name == class_info.class_name and c.time_range == class_info.time_range
+            ]
+            class_id = matches[0] if matches else None
+        if not class_id:
+            self.logger.debug("Booked class has no feed id, reservation request not recorded")
+            return
 
-        if date_elements:
-            date_elements[0].click()
-            self.logger.info(f"Clicked on {date_str}")
-            self.page.wait_for_timeout(3000)
-        else:
-            raise Exception(f"Could not find date element for {date_str}")
+        contract = ApiContract.load()
+        for response in self.calendar_feed.responses[since:]:
+            request = response.request
+            if contract.record_reservation(request.url, request.post_data_json, request.headers, class_id):
+                contract.save()
+                self.logger.info("Recorded reservation API request")
+                return
+
+    def click_and_wait_for_calendar(
+        self, target, name: str, date_str: Optional[str] = None, timeout: Optional[int] = None
+    ):
+        """
+        Click something that reloads the class list and wait for the new data
 
+        Waits for the calendar data request the click triggers. With
+        CLASS_SOURCE=feed the class list is parsed straight from that
+        response; otherwise (or if the payload is not recognised) it waits
+        for the previous list's first row to be replaced and the rendered
+        row count to settle. `timeout` (ms) bounds each of those waits.
+        """
+        self.feed_classes = None
+        marker = self.calendar_feed.mark()
+        old_row = self.page.query_selector(CLASS_ROW_SELECTOR)
+        old_row_text = old_row.inner_text() if old_row else None
+        try:
+            self.waiter.for_response(Config.CALENDAR_DATA_URL_PATTERN, target.click, f"{name} data", timeout)
+        except Exception as e:
+            self.logger.debug(f"No calendar data response observed for {name}: {e}")
+
+        if Config.CLASS_SOURCE == "feed":
+            try:
+                self.feed_classes = self.waiter.for_condition(
+                    lambda: self.calendar_feed.classes_for(date_str, since=marker), f"{name} feed", timeout
+                )
+                self.logger.info(f"Parsed {len(self.feed_classes)} classes from calendar data feed")
+                return
+            except Exception:
+                self.logger.warning("Calendar data feed not recognised, falling back to DOM scraping")
+
+        if old_row:
+            # A day with as many classes as the last one would otherwise pass as settled at once
+            try:
+                replace_ms = min(timeout or Config.CALENDAR_REPLACE_MS, Config.CALENDAR_REPLACE_MS)
+                self.waiter.for_replaced(old_row, old_row_text, f"{name} old rows", replace_ms)
+            except Exception:
+                self.logger.debug(f"Previous first class row unchanged after {name}")
+            try:
+                old_row.dispose()
+            except Exception:
+                pass  # Already released with its page
+        self.waiter.for_row_count_settled(CLASS_ROW_SELECTOR, f"{name} rows", timeout=timeout)
+
+    @timed_step("extract")
+    @recorded_step("extract")
     def extract_classes(self) -> list[ClassInfo]:
         """
         Extract class information from the calendar
@@ -161,13 +475,42 @@ class BrowserService:
         Returns:
             List of ClassInfo objects
         """
+        if self.feed_classes:
+            self.logger.info(f"Using {len(self.feed_classes)} classes from calendar data feed")
+            return self.feed_classes
+
         self.logger.info("Extracting class information...")
-        rows = self.page.locator(".list-item[data-list-item]")
-        count = rows.count()
+        classes = None
+
+        if Config.EXTRACTION_MODE == "evaluate":
+            try:
+                classes = self._extract_classes_evaluate()
+            except Exception as e:
+                self.logger.warning(f"Single-call extraction failed: {e}")
+            if classes is not None and not all(c.time_range or c.class_name for c in classes):
+                self.logger.warning("Single-call extraction found rows without time or name, DOM may have changed")
+                classes = None
+
+        if classes is None:
+            classes = self._extract_classes_locator()
 
-        if count == 0:
+        if not classes:
             raise Exception("No classes found on calendar")
 
+        self.logger.info(f"Extracted {len(classes)} classes")
+        return classes
+
+    def _extract_classes_evaluate(self) -> list[ClassInfo]:
+        """Extract all class rows with a single page.evaluate round-trip"""
+        rows = self.page.evaluate(EXTRACT_CLASSES_JS, CLASS_ROW_SELECTOR)
+        return [ClassInfo(index=i, **row) for i, row in enumerate(rows)]
+
+    def _extract_classes_locator(self) -> list[ClassInfo]:
+        """Extract class rows one locator at a time (slow, but tolerant of DOM changes)"""
+        self.logger.info("Using locator-based extraction")
+        rows = self.page.locator(CLASS_ROW_SELECTOR)
+        count = rows.count()
+
         classes = []
         for i in range(count):
             row = rows.nth(i)
@@ -208,38 +551,127 @@ class BrowserService:
             )
             classes.append(class_info)
 
-        self.logger.info(f"Extracted {len(classes)} classes")
         return classes
 
-    def book_class(self, class_info: ClassInfo):
+    def find_book_button(self, class_info: ClassInfo):
+        """
+        Locate the booking button for a class
+
+        DOM-scraped classes carry the button id. Feed-parsed classes do not,
+        so their row is matched on class name and start time instead.
+        """
+        if class_info.button_id:
+            return self.page.locator(f"#{class_info.button_id}")
+        if class_info.source != "feed":
+            raise Exception(f"No button ID for class: {class_info.class_name}")
+
+        # Anchor the start time so "1:00 PM" does not also match "11:00 PM" or an end time
+        start_time = class_info.time_range.split(" - ")[0].strip()
+        time_cell = self.page.locator(
+            ".list-item-content-left", has_text=re.compile(rf"^\s*{re.escape(start_time)}\s*-")
+        )
+        row = (
+            self.page.locator(CLASS_ROW_SELECTOR)
+            .filter(has_text=class_info.class_name)
+            .filter(has=time_cell)
+        )
+        return self.waiter.for_visible(row.locator("button"), "feed class row")
+
+    def resolve_book_buttons(self, candidates: list[ClassInfo]) -> list[tuple[ClassInfo, Locator]]:
+        """
+        Locate the booking button of each candidate ahead of time
+
+        Candidates whose button cannot be found are left out.
+
+        Returns:
+            (candidate, button locator) pairs in the candidates' order
+        """
+        buttons = []
+        for candidate in candidates:
+            try:
+                buttons.append((candidate, self.find_book_button(candidate)))
+            except Exception as e:
+                self.logger.warning(f"No booking button for {candidate.class_name} at {candidate.time_range}: {e}")
+        return buttons
+
+    def book_first_open(self, buttons: list[tuple[ClassInfo, Locator]], timeout: float) -> ClassInfo:
+        """
+        Poll pre-resolved booking buttons and book the first candidate whose button opens
+
+        Buttons are read in order, so an earlier candidate wins when several
+        are open in the same poll. A candidate whose booking fails is not
+        tried again.
+
+        Args:
+            buttons: (candidate, button locator) pairs from resolve_book_buttons
+            timeout: Seconds to keep polling
+
+        Returns:
+            The booked candidate
+        """
+        deadline = time.monotonic() + timeout
+        remaining = list(buttons)
+        while remaining:
+            for pair in list(remaining):
+                class_info, button = pair
+                try:
+                    button_text = button.inner_text(timeout=1000)
+                except Exception:
+                    continue
+                if booking_state(button_text) != BOOKABLE:
+                    continue
+                class_info.update_button(class_info.button_id, button_text)
+                try:
+                    self.book_class(class_info, button)
+                    return class_info
+                except Exception as e:
+                    self.logger.warning(f"Could not book {class_info.class_name} at {class_info.time_range}: {e}")
+                    remaining.remove(pair)
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(Config.SNIPE_POLL_INTERVAL)
+        raise Exception(f"No candidate class could be booked within {timeout:g}s")
+
+    @timed_step("book")
+    @recorded_step("book")
+    def book_class(self, class_info: ClassInfo, button: Optional[Locator] = None):
         """
         Book a specific class
 
         Args:
             class_info: ClassInfo object with button_id to click
+            button: Its already located booking button (found from class_info if omitted)
         """
-        if not class_info.button_id:
-            raise Exception(f"No button ID for class: {class_info.class_name}")
-
         self.logger.info(f"Booking class: {class_info.class_name} at {class_info.time_range}")
 
         # Click the book button
-        self.page.locator(f"#{class_info.button_id}").click()
+        marker = self.calendar_feed.mark()
+        (button or self.find_book_button(class_info)).click()
+        self.last_click_at = time.monotonic()
         self.logger.info("Clicked book button")
-        self.page.wait_for_timeout(2000)
 
         # Click confirm
         try:
-            self.page.get_by_role("button", name="Confirm Booking").click()
+            confirm_btn = self.page.get_by_role("button", name="Confirm Booking")
+            self.waiter.for_visible(confirm_btn, "confirm dialog").click()
             self.logger.info("Clicked Confirm Booking")
-            self.page.wait_for_timeout(10000)
+            self.waiter.for_hidden(confirm_btn, "booking confirmed")
             self.logger.info("✓ Booking completed successfully")
         except Exception as e:
             raise Exception(f"Failed to confirm booking: {e}")
 
-    def take_screenshot(self, filename: str):
-        """Take a screenshot for debugging"""
+        if Config.BOOKING_BACKEND == "api":
+            self.record_reservation_contract(class_info, marker)
+
+    def take_screenshot(self, filename: str, full_page: bool = False):
+        """
+        Take a screenshot for debugging right now
+
+        Failures are already captured by the flight recorder; this is for
+        one-off inspection. Viewport only unless full_page is set, since
+        full-page captures of the calendar are slow.
+        """
         Config.SCREENSHOT_DIR.mkdir(exist_ok=True)
         path = Config.SCREENSHOT_DIR / filename
-        self.page.screenshot(path=str(path), full_page=True)
+        self.page.screenshot(path=str(path), full_page=full_page)
         self.logger.debug(f"Screenshot saved: {path}")
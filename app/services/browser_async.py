@@ -0,0 +1,99 @@
+"""Asyncio wrapper running BrowserService on its own thread"""
+
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.models import ClassInfo
+from app.services.browser import BrowserService
+
+
+class AsyncBrowserService:
+    """
+    Async facade over BrowserService for the overlapped pipeline
+
+    Playwright's sync objects must stay on the thread that created them, so
+    every call runs on one dedicated worker thread while the event loop is
+    free for the LLM and notifications. That thread owns the one browser
+    and context; new_tab() opens further pages in it, driven from the same
+    thread. Everything else (session reuse, feed parsing, API contract
+    recording, waits, flight recorder, resource filter) is BrowserService's
+    own.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        service: Optional[BrowserService] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.logger = logger
+        self.service = service or BrowserService(logger)
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.close()
+
+    async def _call(self, method: Callable, *args) -> Any:
+        """Run a BrowserService method on the browser thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(method, *args))
+
+    async def start(self):
+        """Start the browser (or connect to a browser server) and open a fresh context"""
+        await self._call(self.service.start)
+
+    async def close(self):
+        """Close the browser (or just this tab) and stop the browser thread if this service owns it"""
+        try:
+            await self._call(self.service.close)
+        finally:
+            if self.owns_executor:
+                self.executor.shutdown(wait=False)
+
+    async def login(self):
+        """Login to Wodify, reusing a saved session when it is still valid"""
+        await self._call(self.service.login)
+
+    async def navigate_to_calendar(self):
+        """Navigate to the Class Calendar"""
+        await self._call(self.service.navigate_to_calendar)
+
+    async def select_date(self, date_str: str):
+        """Select a date ("M/D") in the calendar"""
+        await self._call(self.service.select_date, date_str)
+
+    async def extract_classes(self) -> list[ClassInfo]:
+        """Class list of the selected date"""
+        return await self._call(self.service.extract_classes)
+
+    async def book_class(self, class_info: ClassInfo):
+        """Book a class from the current list"""
+        await self._call(self.service.book_class, class_info)
+
+    async def new_tab(self) -> "AsyncBrowserService":
+        """
+        Open another tab in the same browser context, logged in through its cookies
+
+        The tab runs on this service's browser thread, so its calls queue
+        behind the other tabs' while their pages keep loading in the browser.
+
+        Returns:
+            AsyncBrowserService for the tab; close it before this service
+        """
+        tab = AsyncBrowserService(self.logger, service=await self._call(self.service.new_tab), executor=self.executor)
+        try:
+            await tab._call(tab.service.resume_session)
+        except Exception:
+            await tab.close()
+            raise
+        return tab
@@ -0,0 +1,241 @@
+"""Capture and parse the Wodify calendar's backend data feed"""
+
+import re
+import logging
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Optional
+from playwright.sync_api import Response
+
+from app.models import ClassInfo
+from app.config import Config
+
+# Candidate key names in the OutSystems class list payload, matched
+# case-insensitively against each flattened key ("Class.StartTime" -> "ClassStartTime")
+# and against its last part ("StartTime")
+NAME_KEYS = re.compile(r"^(class)?(name|title|programname)$", re.I)
+START_KEYS = re.compile(r"^(class)?start(time|datetime|date)?$", re.I)
+END_KEYS = re.compile(r"^(class)?end(time|datetime|date)?$", re.I)
+COACH_KEYS = re.compile(r"^(coach|instructor|staff)(name)?$", re.I)
+CAPACITY_KEYS = re.compile(r"^(capacity|maxattendees|classlimit|limit)$", re.I)
+RESERVED_KEYS = re.compile(r"^(reserv\w*count|attendeecount|booked\w*|enrolled\w*|numberofreservations)$", re.I)
+STATE_KEYS = re.compile(r"^(reservation)?(status|state)(name)?$", re.I)
+ID_KEYS = re.compile(r"^(class)?(id|classid|scheduleid)$", re.I)
+
+TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S", "%H:%M:%S", "%H:%M")
+
+
+def parse_feed_time(value: Any) -> Optional[datetime]:
+    """Parse an OutSystems date/time value ("1900-01-01T07:00:00", "07:00:00", ...)"""
+    if not isinstance(value, str) or not value:
+        return None
+    value = value.split(".")[0]
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def format_time(value: datetime) -> str:
+    """Format like the rendered calendar ("7:00 AM")"""
+    return value.strftime("%I:%M %p").lstrip("0")
+
+
+def _key_priority(key: str) -> int:
+    """Prefer top-level keys, then keys nested under a class record, then anything else"""
+    if "." not in key:
+        return 0
+    return 1 if re.match(r"class", key, re.I) else 2
+
+
+def _find_key(item: dict, pattern: re.Pattern) -> Optional[str]:
+    for key in sorted(item, key=_key_priority):
+        if pattern.match(key.replace(".", "")):
+            return key
+        if pattern.match(key.split(".")[-1]) and not COACH_KEYS.match(key.replace(".", "")):
+            return key
+    return None
+
+
+def _unwrap(item: Any) -> Any:
+    """OutSystems wraps list records in single-key objects like {"Class": {...}}"""
+    while isinstance(item, dict) and len(item) == 1 and isinstance(next(iter(item.values())), dict):
+        item = next(iter(item.values()))
+    return item
+
+
+def _flatten(item: dict) -> dict:
+    """Flatten nested record structures one level deep ({"Class": {...}, "Coach": {...}})"""
+    flat = {}
+    for key, value in item.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}.{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+def _is_class_record(item: dict) -> bool:
+    return _find_key(item, NAME_KEYS) is not None and _find_key(item, START_KEYS) is not None
+
+
+def find_class_records(payload: Any) -> Optional[list[dict]]:
+    """
+    Walk a JSON payload looking for the list of class records
+
+    Returns:
+        The first list whose items all look like classes (name + start time), or None
+    """
+    if isinstance(payload, list):
+        records = [_flatten(_unwrap(item)) for item in payload if isinstance(_unwrap(item), dict)]
+        if records and len(records) == len(payload) and all(_is_class_record(r) for r in records):
+            return records
+        children = payload
+    elif isinstance(payload, dict):
+        children = payload.values()
+    else:
+        return None
+
+    for child in children:
+        found = find_class_records(child)
+        if found is not None:
+            return found
+    return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_to_class(index: int, record: dict) -> Optional[ClassInfo]:
+    """Convert a recognised class record into a ClassInfo (None if times are unreadable)"""
+    start = parse_feed_time(record.get(_find_key(record, START_KEYS)))
+    end_key = _find_key(record, END_KEYS)
+    end = parse_feed_time(record.get(end_key)) if end_key else None
+    if start is None:
+        return None
+
+    time_range = f"{format_time(start)} - {format_time(end)}" if end else format_time(start)
+    coach_key = _find_key(record, COACH_KEYS)
+    capacity_key = _find_key(record, CAPACITY_KEYS)
+    reserved_key = _find_key(record, RESERVED_KEYS)
+    state_key = _find_key(record, STATE_KEYS)
+    id_key = _find_key(record, ID_KEYS)
+
+    capacity = _as_int(record.get(capacity_key)) if capacity_key else None
+    reserved = _as_int(record.get(reserved_key)) if reserved_key else None
+    state = str(record.get(state_key)) if state_key and record.get(state_key) is not None else None
+
+    is_full = capacity is not None and reserved is not None and capacity > 0 and reserved >= capacity
+    if state and re.search(r"reserved|booked|manage", state, re.I):
+        button_text = "MANAGE"
+    elif is_full or (state and re.search(r"full|waitlist|closed", state, re.I)):
+        button_text = "FULL"
+    else:
+        button_text = "BOOK"
+
+    return ClassInfo(
+        index=index,
+        time_range=time_range,
+        class_name=str(record.get(_find_key(record, NAME_KEYS), "")),
+        coach=str(record.get(coach_key) or "") if coach_key else "",
+        button_id=None,
+        button_text=button_text,
+        capacity=capacity,
+        reserved=reserved,
+        reservation_state=state,
+        source="feed",
+        start_date=start if start.year > 1900 else None,
+        class_id=str(record[id_key]) if id_key and record.get(id_key) is not None else None,
+    )
+
+
+def parse_payload(payload: Any) -> Optional[list[ClassInfo]]:
+    """
+    Parse a calendar data payload into ClassInfo objects
+
+    Returns:
+        List of ClassInfo, or None if the payload shape is not recognised
+    """
+    records = find_class_records(payload)
+    if not records:
+        return None
+    classes = [c for c in (record_to_class(i, r) for i, r in enumerate(records)) if c]
+    return classes or None
+
+
+def filter_by_date(classes: list[ClassInfo], date_str: str) -> list[ClassInfo]:
+    """Keep classes starting on the "M/D" date, re-indexed from 0"""
+    month, day = (int(part) for part in date_str.split("/"))
+    matching = [c for c in classes if c.start_date and (c.start_date.month, c.start_date.day) == (month, day)]
+    return [replace(cls, index=i) for i, cls in enumerate(matching)]
+
+
+class CalendarFeed:
+    """
+    Collects calendar data responses from Playwright network events
+
+    The handler only stores Response objects; bodies are read later from
+    the main flow, since blocking calls inside sync-API event handlers are
+    not safe.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.pattern = re.compile(Config.CALENDAR_DATA_URL_PATTERN)
+        self.responses: list[Response] = []
+        self._parsed: dict[int, Optional[list[ClassInfo]]] = {}
+        self.last_match: Optional[Response] = None
+
+    def on_response(self, response: Response):
+        """Playwright "response" event handler"""
+        if self.pattern.search(response.url) and "json" in (response.headers.get("content-type") or ""):
+            self.responses.append(response)
+
+    def mark(self) -> int:
+        """Position marker: responses captured after this point are 'new'"""
+        return len(self.responses)
+
+    def _classes_from(self, position: int) -> Optional[list[ClassInfo]]:
+        if position not in self._parsed:
+            try:
+                self._parsed[position] = parse_payload(self.responses[position].json())
+            except Exception as e:
+                self.logger.debug(f"Unreadable calendar response {self.responses[position].url}: {e}")
+                self._parsed[position] = None
+        return self._parsed[position]
+
+    def classes_for(self, date_str: Optional[str] = None, since: int = 0) -> Optional[list[ClassInfo]]:
+        """
+        Get classes from the newest recognised payload
+
+        Args:
+            date_str: Optional "M/D" date; when the payload carries dates,
+                only classes on that date are returned
+            since: Only consider payloads without dates if captured at or after this marker
+
+        Returns:
+            List of ClassInfo, or None if no captured payload could be recognised
+        """
+        for position in range(len(self.responses) - 1, -1, -1):
+            classes = self._classes_from(position)
+            if not classes:
+                continue
+
+            dated = all(c.start_date for c in classes)
+            if date_str and dated:
+                classes = filter_by_date(classes, date_str)
+                if not classes:
+                    continue
+            elif position < since:
+                continue
+
+            self.last_match = self.responses[position]
+            return [replace(cls, index=i) for i, cls in enumerate(classes)]
+        return None
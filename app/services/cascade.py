@@ -0,0 +1,96 @@
+"""Model cascade bookkeeping: per-tier latency, escalation rate and agreement"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import Config
+
+
+@dataclass
+class TierResult:
+    """One model's attempt within a cascade run"""
+
+    model: str
+    latency_ms: float
+    selected_index: Optional[int] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def accepted(self) -> bool:
+        """Valid answer confident enough to stop the cascade"""
+        return (
+            self.error is None
+            and self.selected_index is not None
+            and (self.confidence or 0.0) >= Config.CASCADE_MIN_CONFIDENCE
+        )
+
+
+class CascadeStats:
+    """
+    Running totals for the model cascade, kept in CACHE_DIR
+
+    Agreement compares each escalated tier's answer with the tier that
+    finally decided. A small model that is usually right even when unsure
+    means CASCADE_MIN_CONFIDENCE can come down.
+    """
+
+    STATS_FILE = "cascade_stats.json"
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.path = Config.CACHE_DIR / self.STATS_FILE
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault("runs", 0)
+        data.setdefault("escalated", 0)
+        data.setdefault("agreed", 0)
+        data.setdefault("compared", 0)
+        data.setdefault("tiers", {})
+        return data
+
+    def _save(self):
+        try:
+            Config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.data))
+        except OSError as e:
+            self.logger.debug(f"Could not save cascade stats: {e}")
+
+    def record(self, tiers: list[TierResult]):
+        """Add one cascade run; the last tier is the one whose answer was used"""
+        data = self.data
+        data["runs"] += 1
+        if len(tiers) > 1:
+            data["escalated"] += 1
+
+        final = tiers[-1]
+        for tier in tiers:
+            stats = data["tiers"].setdefault(tier.model, {"calls": 0, "total_ms": 0.0, "failures": 0})
+            stats["calls"] += 1
+            stats["total_ms"] += tier.latency_ms
+            stats["failures"] += tier.error is not None
+        for tier in tiers[:-1]:
+            if tier.selected_index is not None and final.selected_index is not None:
+                data["compared"] += 1
+                data["agreed"] += tier.selected_index == final.selected_index
+
+        self._save()
+        self.logger.info(f"Cascade: {self.summary()}")
+
+    def summary(self) -> str:
+        """One line of per-tier average latency, escalation rate and agreement"""
+        data = self.data
+        tiers = ", ".join(
+            f"{model} {s['total_ms'] / s['calls']:.0f}ms avg over {s['calls']} calls ({s['failures']} failed)"
+            for model, s in data["tiers"].items()
+        )
+        escalation = data["escalated"] / data["runs"] * 100 if data["runs"] else 0
+        agreement = f"{data['agreed']}/{data['compared']}" if data["compared"] else "n/a"
+        return f"{tiers}; escalated {data['escalated']}/{data['runs']} ({escalation:.0f}%); agreement {agreement}"
@@ -0,0 +1,159 @@
+"""Finds calendar date tiles without regex-scanning every div on the page"""
+
+import re
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from playwright.sync_api import Locator, Page
+
+from app.services.waits import PageWaiter
+
+DATE_ATTRIBUTE = "data-autosignup-date"
+
+# Week paging controls on the Class Calendar date strip
+NEXT_WEEK_SELECTOR = "[aria-label*='next' i], .fa-chevron-right, .icon-chevron-right"
+PREV_WEEK_SELECTOR = "[aria-label*='prev' i], .fa-chevron-left, .icon-chevron-left"
+MAX_PAGES = 4
+
+# Class rows also hold "M/D"-looking text (capacity cells such as "11/12")
+ROW_SELECTOR = ".list-item"
+
+# Tags every visible date tile in one pass and returns the dates found. A tile
+# is the outermost div outside the class rows whose text ends in "M/D" and
+# contains no other date; the strip around it holds several dates and so
+# never qualifies.
+TAG_DATE_TILES_JS = """
+([attr, rowSelector]) => {
+    document.querySelectorAll(`[${attr}]`).forEach((el) => el.removeAttribute(attr));
+    const dates = [];
+    for (const div of document.querySelectorAll("div")) {
+        if (div.closest(rowSelector)) continue;
+        const text = (div.textContent || "").trim();
+        const match = text.match(/(?:^|\\D)(\\d{1,2}\\/\\d{1,2})$/);
+        if (!match || (text.match(/\\d{1,2}\\/\\d{1,2}/g) || []).length !== 1) continue;
+        if (dates.includes(match[1])) continue;
+        div.setAttribute(attr, match[1]);
+        dates.push(match[1]);
+    }
+    return dates;
+}
+"""
+
+
+def date_key(date_str: str, today: Optional[datetime] = None) -> Optional[datetime]:
+    """Full date for an "M/D" string, picking the year that puts it closest to today (None if not a date)"""
+    today = today or datetime.now()
+    try:
+        month, day = (int(part) for part in date_str.split("/"))
+    except ValueError:
+        return None
+    candidates = []
+    for offset in (-1, 0, 1):
+        try:
+            candidates.append(datetime(today.year + offset, month, day))
+        except ValueError:
+            continue  # Month or day 0, or Feb 29 outside a leap year
+    if not candidates:
+        return None
+    return min(candidates, key=lambda d: abs((d - today).days))
+
+
+class DateNavigator:
+    """
+    Maps "M/D" dates to the calendar's date tiles
+
+    The visible week is scanned once (TAG_DATE_TILES_JS) and each tile gets a
+    data attribute, so later lookups are a single attribute selector. The map
+    is rebuilt when a tile has gone stale, the strip is paged when the date is
+    off-screen, and the old regex scan over every div is the last resort.
+    """
+
+    def __init__(self, page: Page, logger: logging.Logger, waiter: PageWaiter):
+        self.page = page
+        self.logger = logger
+        self.waiter = waiter
+        self.visible_dates: list[str] = []
+        self.lookups = Counter()
+
+    def scan(self) -> list[str]:
+        """Tag the visible date tiles and return their dates"""
+        self.visible_dates = self.page.evaluate(TAG_DATE_TILES_JS, [DATE_ATTRIBUTE, ROW_SELECTOR])
+        self.lookups["scan"] += 1
+        return self.visible_dates
+
+    def tile(self, date_str: str) -> Locator:
+        """Locator for a tagged tile"""
+        return self.page.locator(f'[{DATE_ATTRIBUTE}="{date_str}"]')
+
+    def _tagged(self, date_str: str) -> Optional[Locator]:
+        if date_str not in self.visible_dates:
+            return None
+        tile = self.tile(date_str)
+        return tile if tile.count() else None
+
+    def page_towards(self, date_str: str) -> bool:
+        """Click next/previous week once, depending on where the date lies; False if it can't"""
+        if not self.visible_dates:
+            return False
+        target = date_key(date_str)
+        visible = sorted(key for key in (date_key(d) for d in self.visible_dates) if key)
+        if target is None or not visible or visible[0] <= target <= visible[-1]:
+            return False
+
+        selector = NEXT_WEEK_SELECTOR if target > visible[-1] else PREV_WEEK_SELECTOR
+        control = self.page.locator(selector).first
+        if not control.count():
+            return False
+
+        before = list(self.visible_dates)
+        control.click()
+        self.lookups["page"] += 1
+        self.waiter.for_condition(lambda: self.scan() != before, f"date strip after paging to {date_str}")
+        return True
+
+    def locate(self, date_str: str) -> Locator:
+        """
+        Find the tile for a date
+
+        Args:
+            date_str: Date string in "M/D" format (e.g., "11/14")
+
+        Returns:
+            Locator for the date tile
+        """
+        tile = self._tagged(date_str)
+        if tile:
+            self.lookups["hit"] += 1
+            return tile
+
+        self.scan()
+        for _ in range(MAX_PAGES):
+            tile = self._tagged(date_str)
+            if tile:
+                return tile
+            try:
+                if not self.page_towards(date_str):
+                    break
+            except Exception as e:
+                self.logger.debug(f"Paging towards {date_str} failed: {e}")
+                break
+
+        tile = self._tagged(date_str)
+        if tile:
+            return tile
+
+        self.logger.debug(f"Date tile {date_str} not mapped, falling back to regex scan")
+        self.lookups["fallback"] += 1
+        date_pattern = f".*{re.escape(date_str)}$"
+        date_elements = (
+            self.page.locator(f"div:not({ROW_SELECTOR} div)").filter(has_text=re.compile(date_pattern)).all()
+        )
+        if not date_elements:
+            raise Exception(f"Could not find date element for {date_str}")
+        return date_elements[0]
+
+    def report(self):
+        """Log how dates were found"""
+        if self.lookups:
+            self.logger.info("Date lookups: " + ", ".join(f"{k}={v}" for k, v in sorted(self.lookups.items())))
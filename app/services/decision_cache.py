@@ -0,0 +1,124 @@
+"""Disk cache of LLM class selections for schedules seen before"""
+
+import json
+import time
+import hashlib
+import logging
+from typing import Optional
+
+from app.config import Config
+from app.models import ClassInfo, LLMResponse
+
+
+def class_key(cls: ClassInfo) -> list[str]:
+    """
+    The parts of a class the selection depends on (button ids and coaches change week to week)
+
+    The booking state is included, so a class that has filled up since an
+    answer was cached makes the schedule a miss instead of replaying it.
+    """
+    return [" ".join(cls.time_range.split()), " ".join(cls.class_name.split()).upper(), cls.state]
+
+
+def fingerprint(classes: list[ClassInfo], system_prompt: str, model: str) -> str:
+    """Hash of the normalized schedule plus everything else that shapes the LLM's answer"""
+    payload = json.dumps(
+        {
+            "classes": sorted(class_key(c) for c in classes),
+            "prompt": hashlib.sha256(system_prompt.encode()).hexdigest(),
+            "model": model,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DecisionCache:
+    """
+    Maps schedule fingerprints to the LLM's choice
+
+    Selection runs at temperature 0, so the same schedule, prompt and model
+    give the same answer. Entries store the chosen class by time and name
+    rather than index, and hits are mapped back onto the current list.
+    Entries expire after DECISION_CACHE_TTL_DAYS; beyond
+    DECISION_CACHE_SIZE the least recently used are dropped.
+    """
+
+    CACHE_FILE = "decisions.json"
+
+    def __init__(self, logger: logging.Logger, system_prompt: str, model: str = None):
+        self.logger = logger
+        self.system_prompt = system_prompt
+        self.model = model or Config.OLLAMA_MODEL
+        self.path = Config.CACHE_DIR / self.CACHE_FILE
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault("entries", {})
+        data.setdefault("stats", {"hits": 0, "misses": 0})
+        return data
+
+    def _save(self):
+        try:
+            Config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.data))
+        except OSError as e:
+            self.logger.debug(f"Could not save decision cache: {e}")
+
+    def _evict(self, now: float):
+        entries = self.data["entries"]
+        ttl = Config.DECISION_CACHE_TTL_DAYS * 86400
+        for key in [k for k, e in entries.items() if now - e["created_at"] > ttl]:
+            del entries[key]
+        overflow = len(entries) - Config.DECISION_CACHE_SIZE
+        if overflow > 0:
+            for key in sorted(entries, key=lambda k: entries[k]["used_at"])[:overflow]:
+                del entries[key]
+
+    def _record(self, hit: bool):
+        stats = self.data["stats"]
+        stats["hits" if hit else "misses"] += 1
+        total = stats["hits"] + stats["misses"]
+        self.logger.info(
+            f"Decision cache {'hit' if hit else 'miss'} (hit rate {stats['hits']}/{total}, "
+            f"{stats['hits'] / total * 100:.0f}%)"
+        )
+
+    def get(self, classes: list[ClassInfo]) -> Optional[LLMResponse]:
+        """
+        Look up a cached selection for this schedule
+
+        Returns:
+            LLMResponse with selected_index remapped onto `classes`, or None on a miss
+        """
+        now = time.time()
+        self._evict(now)
+        entry = self.data["entries"].get(fingerprint(classes, self.system_prompt, self.model))
+        if entry:
+            matches = [c.index for c in classes if class_key(c) == entry["selected"]]
+            if matches:
+                entry["used_at"] = now
+                self._record(hit=True)
+                self._save()
+                return LLMResponse(matches[0], entry["reasoning"], entry["notify_user"])
+
+        self._record(hit=False)
+        self._save()
+        return None
+
+    def put(self, classes: list[ClassInfo], response: LLMResponse):
+        """Store the LLM's choice for this schedule"""
+        now = time.time()
+        self.data["entries"][fingerprint(classes, self.system_prompt, self.model)] = {
+            "selected": class_key(classes[response.selected_index]),
+            "reasoning": response.reasoning,
+            "notify_user": response.notify_user,
+            "created_at": now,
+            "used_at": now,
+        }
+        self._evict(now)
+        self._save()
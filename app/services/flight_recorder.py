@@ -0,0 +1,133 @@
+"""Failure-only flight recorder: cheap in-memory snapshots, written to disk when a step raises"""
+
+import json
+import time
+import shutil
+import logging
+import functools
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import Page
+
+from app.config import Config
+
+# The whole <body> HTML (hidden elements included), truncated in the page so large calendars are not shipped whole
+DOM_SNIPPET_JS = "(limit) => (document.body ? document.body.outerHTML : '').slice(0, limit)"
+
+
+@dataclass
+class Snapshot:
+    """Page state at one point in the run"""
+
+    step: str
+    url: str
+    captured_at: float
+    dom: str
+    jpeg: Optional[bytes] = None
+
+
+class FlightRecorder:
+    """
+    Bounded ring buffer of page snapshots
+
+    Capturing a snapshot costs one evaluate (plus a viewport JPEG when
+    RECORDER_IMAGES is on), so it can run before every step. Nothing touches
+    the disk until dump() is called, normally because a step raised. Dumps go
+    to SCREENSHOT_DIR/flight-<timestamp>/ and the oldest dumps are deleted
+    once the directory exceeds RECORDER_MAX_MB.
+    """
+
+    def __init__(self, logger: logging.Logger, capacity: int = None, images: bool = None):
+        self.logger = logger
+        self.snapshots: deque[Snapshot] = deque(maxlen=capacity or Config.RECORDER_CAPACITY)
+        self.images = Config.RECORDER_IMAGES if images is None else images
+        self.capture_ms = 0.0
+
+    def capture(self, page: Optional[Page], step: str, image: bool = None):
+        """Add a snapshot of the page to the buffer (never raises)"""
+        if page is None:
+            return
+        start = time.perf_counter()
+        try:
+            dom = page.evaluate(DOM_SNIPPET_JS, Config.RECORDER_DOM_CHARS)
+            jpeg = None
+            if self.images if image is None else image:
+                jpeg = page.screenshot(type="jpeg", quality=Config.RECORDER_JPEG_QUALITY, full_page=False)
+            self.snapshots.append(Snapshot(step, page.url, time.time(), dom, jpeg))
+        except Exception as e:
+            self.logger.debug(f"Flight recorder could not capture '{step}': {e}")
+        finally:
+            self.capture_ms += (time.perf_counter() - start) * 1000
+
+    def dump(self, reason: str) -> Optional[Path]:
+        """
+        Write the buffered snapshots to SCREENSHOT_DIR
+
+        Args:
+            reason: Why the dump happened (usually the exception message)
+
+        Returns:
+            Directory the snapshots were written to, or None if the buffer was empty
+        """
+        if not self.snapshots:
+            return None
+        directory = Config.SCREENSHOT_DIR / f"flight-{datetime.now():%Y%m%d-%H%M%S-%f}"
+        directory.mkdir(parents=True, exist_ok=True)
+
+        index = []
+        for i, snapshot in enumerate(self.snapshots):
+            stem = f"{i:02d}_{snapshot.step.replace(' ', '_')}"
+            (directory / f"{stem}.html").write_text(snapshot.dom)
+            if snapshot.jpeg:
+                (directory / f"{stem}.jpg").write_bytes(snapshot.jpeg)
+            index.append({"file": stem, "step": snapshot.step, "url": snapshot.url, "captured_at": snapshot.captured_at})
+        (directory / "index.json").write_text(json.dumps({"reason": reason, "snapshots": index}, indent=2))
+
+        self.logger.info(f"Flight recorder: {len(index)} snapshots written to {directory}")
+        self.rotate()
+        return directory
+
+    def rotate(self):
+        """Delete the oldest dumps until they fit in RECORDER_MAX_MB"""
+        dumps = sorted(Config.SCREENSHOT_DIR.glob("flight-*"))
+        sizes = {d: sum(f.stat().st_size for f in d.iterdir()) for d in dumps}
+        total = sum(sizes.values())
+        limit = Config.RECORDER_MAX_MB * 1024 * 1024
+        for old in dumps[:-1]:
+            if total <= limit:
+                break
+            shutil.rmtree(old, ignore_errors=True)
+            total -= sizes[old]
+            self.logger.debug(f"Flight recorder: removed old dump {old.name}")
+
+
+def recorded_step(name: str):
+    """
+    Decorator that snapshots self.page before a step and dumps self.recorder if it raises
+
+    The failing page is captured with an image regardless of RECORDER_IMAGES.
+    An exception is dumped once, by the innermost recorded step it passes.
+
+    Args:
+        name: Step name used for the snapshot
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self.recorder.capture(self.page, name)
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                if not getattr(e, "flight_recorded", False):
+                    self.recorder.capture(self.page, f"{name} failed", image=True)
+                    self.recorder.dump(f"{name}: {e}")
+                    e.flight_recorded = True
+                raise
+
+        return wrapper
+
+    return decorator
@@ -1,11 +1,22 @@
 """LLM service using Ollama for intelligent class selection"""
 
 import json
+import time
 import logging
+import threading
+from typing import Any, Optional
 import ollama
 
 from app.models import ClassInfo, LLMResponse
 from app.config import Config
+from app.services.cascade import CascadeStats, TierResult
+from app.services.decision_cache import DecisionCache
+from app.services.preferences import PreferenceEngine
+from app.services.prompt_builder import PromptBuilder
+from app.services.streaming import PendingSelection
+
+# load_duration above this means the model was not resident when the request arrived
+COLD_LOAD_MS = 500
 
 
 class LLMService:
@@ -13,12 +24,77 @@ class LLMService:
 
     def __init__(self, logger: logging.Logger):
         self.logger = logger
-        self.client = ollama.Client(host=Config.OLLAMA_HOST)
-        self.system_prompt = Config.get_system_prompt()
+        self.client = ollama.Client(host=Config.OLLAMA_HOST, timeout=Config.LLM_DEADLINE_SECONDS)
+        self.warm_client = ollama.Client(host=Config.OLLAMA_HOST)  # No timeout: a cold load can take a while (selections wait only until their deadline)
+        self.prompts = PromptBuilder(logger)
+        self.system_prompt = self.prompts.system_prompt
+        self.preferences = PreferenceEngine(logger)
+        self.models = Config.OLLAMA_MODELS
+        self.decision_cache = (
+            DecisionCache(logger, self.system_prompt, ",".join(self.models)) if Config.DECISION_CACHE else None
+        )
+        self.cascade_stats = CascadeStats(logger) if len(self.models) > 1 else None
+        self.warm_thread: Optional[threading.Thread] = None
+
+    def log_durations(self, label: str, response: Any):
+        """Log Ollama's load/total durations, telling cold model loads from warm hits"""
+        load_ms = (response.get("load_duration") or 0) / 1e6
+        total_ms = (response.get("total_duration") or 0) / 1e6
+        state = "cold load" if load_ms >= COLD_LOAD_MS else "warm"
+        prefill = ""
+        if response.get("prompt_eval_count") is not None:
+            prefill_ms = (response.get("prompt_eval_duration") or 0) / 1e6
+            prefill = f", prefill {response['prompt_eval_count']} tokens in {prefill_ms:.0f}ms"
+        self.logger.info(f"LLM {label}: {state} (load {load_ms:.0f}ms{prefill}, total {total_ms:.0f}ms)")
+
+    def warm_up(self):
+        """
+        Load the model(s) into Ollama's memory ahead of the first selection
+
+        The request carries the system prompt, so its prefill is cached
+        while the browser logs in and the calendar renders; the selection
+        then only has to process the class list after it.
+        """
+        system = [{"role": "system", "content": self.system_prompt}]
+        for model in self.models:
+            try:
+                response = self.warm_client.chat(
+                    model=model,
+                    messages=system,
+                    options={"temperature": 0, "num_predict": 1},
+                    keep_alive=Config.OLLAMA_KEEP_ALIVE,
+                )
+                self.log_durations(f"warm-up ({model})", response)
+            except Exception as e:
+                self.logger.warning(f"LLM warm-up of {model} failed: {e}")
+
+    def start_warm_up(self):
+        """Warm the model on a background thread; the first LLM call waits for it"""
+        self.warm_thread = threading.Thread(target=self.warm_up, name="llm-warm-up", daemon=True)
+        self.warm_thread.start()
+
+    def wait_for_warm_up(self, deadline: float):
+        """Wait for the background warm-up, but not past `deadline` (time.monotonic())"""
+        if not self.warm_thread or not self.warm_thread.is_alive():
+            return
+        self.warm_thread.join(timeout=max(deadline - time.monotonic(), 0))
+        if self.warm_thread.is_alive():
+            self.logger.warning("LLM warm-up still running at the deadline")
+
+    def release(self):
+        """Unload the model once the booking is done (OLLAMA_UNLOAD_AFTER_RUN)"""
+        if not Config.OLLAMA_UNLOAD_AFTER_RUN:
+            return
+        for model in self.models:
+            try:
+                self.client.generate(model=model, prompt="", keep_alive=0)
+                self.logger.info(f"Unloaded LLM model {model}")
+            except Exception as e:
+                self.logger.debug(f"LLM unload of {model} failed: {e}")
 
     def select_class(self, classes: list[ClassInfo]) -> LLMResponse:
         """
-        Use LLM to select the best class from available options
+        Select the best class, using the rule engine when the day is clear-cut
 
         Args:
             classes: List of ClassInfo objects
@@ -26,53 +102,401 @@ class LLMService:
         Returns:
             LLMResponse with selected_index, reasoning, and notify_user flag
         """
+        return self.begin_select(classes).result()
+
+    def begin_select(self, classes: list[ClassInfo]) -> PendingSelection:
+        """
+        Start selecting a class; the index may be known before the reasoning
+
+        Tries the rule engine, then the decision cache, then the LLM
+        (the model cascade when OLLAMA_MODELS lists several, otherwise
+        streamed when LLM_STREAMING is on), hedged by a heuristic pick
+        when LLM_BUDGET_SECONDS is set.
+
+        Args:
+            classes: List of ClassInfo objects
+
+        Returns:
+            PendingSelection whose decision() is the index and result() the full LLMResponse
+        """
         if not classes:
             raise ValueError("No classes provided for selection")
 
-        # Format classes as display strings
-        classes_text = "\n".join([c.to_display_string() for c in classes])
+        known = self.known_selection(classes)
+        if known:
+            return PendingSelection.resolved(self.logger, known)
+
+        if self.cascade_stats:
+            pending = PendingSelection.background(self.logger, lambda: self.select_with_cascade(classes))
+        elif Config.LLM_STREAMING:
+            pending = self.stream_with_llm(classes)
+        elif Config.LLM_BUDGET_SECONDS > 0:
+            pending = PendingSelection.background(self.logger, lambda: self.select_with_llm(classes))
+        else:
+            pending = PendingSelection.resolved(self.logger, self.select_with_llm(classes))
+        pending.on_complete(lambda response, final_chunk: self._on_llm_complete(classes, pending, response, final_chunk))
+        if Config.LLM_BUDGET_SECONDS > 0:
+            return self.hedge(classes, pending)
+        return pending
 
-        self.logger.info(f"Sending {len(classes)} classes to LLM for selection")
-        self.logger.debug(f"Classes:\n{classes_text}")
+    def known_selection(self, classes: list[ClassInfo]) -> Optional[LLMResponse]:
+        """The rule engine's or decision cache's answer, if either has one"""
+        if Config.RULE_FAST_PATH:
+            decision = self.preferences.select(classes)
+            if decision:
+                self.logger.info(f"Rule engine selected class #{decision.selected_index}, skipping LLM")
+                self.preferences.record("rules")
+                return decision
 
+        if self.decision_cache:
+            cached = self.decision_cache.get(classes)
+            if cached:
+                self.logger.info(f"Reusing cached selection #{cached.selected_index}: {cached.reasoning}")
+                self.preferences.record("cache")
+                return cached
+        return None
+
+    def select_batch(self, schedules: list[list[ClassInfo]]) -> list[LLMResponse]:
+        """
+        Select a class for each of several independent schedules
+
+        Schedules the rule engine or cache can answer are settled first; the
+        rest go to the LLM in one structured request, sharing a single
+        prefill of the system prompt. Each answer is validated against its
+        own schedule, and any that is missing or out of range is re-asked on
+        its own (with the usual repair retries). When LLM_BUDGET_SECONDS is
+        set, schedules still unanswered at the budget get the heuristic pick,
+        as in hedge(); late answers are still cached.
+
+        Args:
+            schedules: Class lists, e.g. one per date
+
+        Returns:
+            One LLMResponse per schedule, in order
+        """
+        if any(not classes for classes in schedules):
+            raise ValueError("No classes provided for selection")
+
+        results = [self.known_selection(classes) for classes in schedules]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+
+        start = time.perf_counter()
+        answers: dict[int, LLMResponse] = {}
+        budget = Config.LLM_BUDGET_SECONDS
+        if budget > 0:
+            errors = []
+
+            def run():
+                try:
+                    self._batch_with_llm(schedules, todo, answers)
+                except Exception as e:
+                    errors.append(e)
+
+            worker = threading.Thread(target=run, name="llm-batch", daemon=True)
+            worker.start()
+            worker.join(budget)
+            if worker.is_alive() or errors:
+                reason = errors[0] if errors else f"no answer within {budget:g}s"
+                self.logger.warning(f"Hedge: heuristic picks for {len(todo) - len(answers)} schedules ({reason})")
+        else:
+            self._batch_with_llm(schedules, todo, answers)
+
+        answered = 0
+        for i in todo:
+            results[i] = answers.get(i)
+            if results[i] is None:
+                results[i] = self.preferences.fallback(schedules[i])
+                self.preferences.record("heuristic")
+            else:
+                answered += 1
+                self.preferences.record("llm")
+
+        elapsed = time.perf_counter() - start
+        self.logger.info(
+            f"Batch: {answered} LLM decisions in {elapsed * 1000:.0f}ms ({answered / elapsed:.1f}/s), "
+            f"{len(todo) - answered} by heuristic, {len(schedules) - len(todo)} settled by rules or cache"
+        )
+        return results
+
+    def _batch_with_llm(self, schedules: list[list[ClassInfo]], todo: list[int], answers: dict[int, LLMResponse]):
+        """Ask the LLM about schedules[i] for each i in todo, filling answers as they are validated"""
+        batch = [schedules[i] for i in todo]
+        messages = self.prompts.batch_messages(batch)
+        self.logger.info(f"Sending {len(batch)} schedules to LLM in one batch")
+        deadline = time.monotonic() + Config.LLM_DEADLINE_SECONDS
+        self.wait_for_warm_up(deadline)
+
+        selections = []
         try:
-            response = self.client.chat(
-                model=Config.OLLAMA_MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {
-                        "role": "user",
-                        "content": f"Here are the available classes:\n\n{classes_text}\n\nWhich class should I book?",
-                    },
-                ],
-                format="json",  # Request structured JSON output
-                options={"temperature": 0},  # Deterministic
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"LLM deadline of {Config.LLM_DEADLINE_SECONDS:g}s reached during warm-up")
+            sizes = [len(classes) for classes in batch]
+            response = self.chat(
+                messages, range(max(sizes)), schema=LLMResponse.batch_schema(sizes), timeout=remaining
             )
+            self.logger.debug(f"LLM raw batch response: {response['message']['content']}")
+            self.log_durations("batch", response)
+            selections = json.loads(response["message"]["content"])["selections"]
+        except Exception as e:
+            self.logger.warning(f"Batch selection failed ({e}), selecting one schedule at a time")
 
-            response_text = response["message"]["content"]
-            self.logger.debug(f"LLM raw response: {response_text}")
+        reasked = 0
+        for position, i in enumerate(todo):
+            classes = schedules[i]
+            try:
+                selection = LLMResponse.from_dict(selections[position])
+                if not 0 <= selection.selected_index < len(classes):
+                    raise ValueError(
+                        f"LLM selected invalid index {selection.selected_index} (valid range: 0-{len(classes) - 1})"
+                    )
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                if selections:
+                    self.logger.warning(f"Batch answer {position + 1} invalid ({e}), asking again on its own")
+                reasked += 1
+                selection = self.select_with_llm(classes)
+            if self.decision_cache:
+                self.decision_cache.put(classes, selection)
+            answers[i] = selection
+        if reasked:
+            self.logger.info(f"Batch: {reasked} of {len(batch)} schedules re-asked individually")
 
-            # Parse JSON response
-            result_dict = json.loads(response_text)
-            llm_response = LLMResponse.from_dict(result_dict)
+    def hedge(self, classes: list[ClassInfo], pending: PendingSelection) -> PendingSelection:
+        """
+        Book the heuristic pick if the LLM has not chosen within LLM_BUDGET_SECONDS
 
-            self.logger.info(f"LLM selected class #{llm_response.selected_index}")
-            self.logger.info(f"Reasoning: {llm_response.reasoning}")
-            self.logger.info(f"Notify user: {llm_response.notify_user}")
+        The budget counts from when the selection started, including any
+        wait for the model warm-up. The heuristic is computed up front (it
+        takes microseconds), so whichever side wins costs no extra wait. A
+        late LLM answer is still logged against the heuristic's choice and
+        cached for next time.
 
-            # Validate the selection
-            if llm_response.selected_index < 0 or llm_response.selected_index >= len(classes):
-                raise ValueError(
-                    f"LLM selected invalid index {llm_response.selected_index} (valid range: 0-{len(classes) - 1})"
-                )
+        Args:
+            classes: List of ClassInfo objects
+            pending: The in-flight LLM selection
+
+        Returns:
+            pending if the LLM decided in time, otherwise a resolved heuristic selection
+        """
+        budget = Config.LLM_BUDGET_SECONDS
+        fallback = self.preferences.fallback(classes)
+        remaining = budget - (time.perf_counter() - pending.started_at)
+        if pending.decided.wait(max(remaining, 0)) and pending.index is not None:
+            self.logger.info(
+                f"Hedge: LLM won at {pending.decision_ms:.0f}ms, {budget * 1000 - pending.decision_ms:.0f}ms inside "
+                f"the {budget:g}s budget (heuristic would have picked #{fallback.selected_index})"
+            )
+            return pending
+
+        pending.superseded = True
+        reason = pending.error or f"no answer within {budget:g}s"
+        self.logger.warning(f"Hedge: heuristic won with #{fallback.selected_index} ({reason})")
+        self.preferences.record("heuristic")
 
-            return llm_response
+        def late(response: LLMResponse, final_chunk: Any):
+            agreement = "agrees" if response.selected_index == fallback.selected_index else "disagrees"
+            self.logger.info(
+                f"Hedge: LLM answered #{response.selected_index} at {pending.total_ms:.0f}ms, "
+                f"{pending.total_ms - budget * 1000:.0f}ms over budget ({agreement} with the heuristic)"
+            )
 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse LLM JSON response: {e}")
-            self.logger.error(f"Raw response: {response_text}")
-            raise Exception(f"LLM returned invalid JSON: {e}")
+        pending.on_complete(late)
+        return PendingSelection.resolved(self.logger, fallback)
 
-        except Exception as e:
-            self.logger.error(f"Error during LLM selection: {e}")
-            raise
+    def _on_llm_complete(
+        self, classes: list[ClassInfo], pending: PendingSelection, response: LLMResponse, final_chunk: Any
+    ):
+        if final_chunk is not None:
+            self.log_durations("selection", final_chunk)
+        self.logger.info(f"Reasoning: {response.reasoning}")
+        self.logger.info(f"Notify user: {response.notify_user}")
+        if not pending.superseded:
+            self.preferences.record("llm")
+        if self.decision_cache:
+            self.decision_cache.put(classes, response)
+
+    def repair_messages(
+        self, messages: list[dict], output: Optional[str], error: Optional[Exception], indices: list[int]
+    ) -> list[dict]:
+        """The original prompt, or the prompt plus the bad answer and what was wrong with it"""
+        if error is None:
+            return messages
+        return messages + [
+            {"role": "assistant", "content": output or ""},
+            {
+                "role": "user",
+                "content": f"That answer was invalid ({error}). Reply with only the JSON object; "
+                f"selected_index must be one of the listed indices ({', '.join(map(str, indices))}).",
+            },
+        ]
+
+    def chat(
+        self,
+        messages: list[dict],
+        indices: list[int],
+        stream: bool = False,
+        model: str = None,
+        confidence: bool = False,
+        schema: dict = None,
+        timeout: float = None,
+    ):
+        """
+        Selection request with selected_index limited to `indices` (the last cascade model unless given)
+
+        A timeout (seconds, usually what is left of the deadline) gets its
+        own client, as ollama.Client fixes the timeout when it is created.
+        """
+        client = self.client if timeout is None else ollama.Client(host=Config.OLLAMA_HOST, timeout=timeout)
+        return client.chat(
+            model=model or self.models[-1],
+            messages=messages,
+            format=schema or LLMResponse.json_schema(indices, confidence),
+            options={"temperature": 0},  # Deterministic
+            keep_alive=Config.OLLAMA_KEEP_ALIVE,
+            stream=stream,
+        )
+
+    def stream_with_llm(self, classes: list[ClassInfo]) -> PendingSelection:
+        """
+        Ask the LLM with a streamed response
+
+        selected_index is surfaced as soon as the model emits it; with
+        LLM_STREAM_CUTOFF the generation is stopped at that point.
+        """
+        # Only the classes that fit the token budget are listed, so only their indices may be chosen
+        listed = self.prompts.fit_budget(classes)
+        indices = [c.index for c in listed]
+        messages = self.prompts.messages(listed)
+        self.logger.info(f"Streaming {len(classes)} classes to LLM for selection")
+        self.logger.debug(f"Classes:\n{messages[-1]['content']}")
+
+        def open_stream(output: Optional[str], error: Optional[Exception]):
+            # Waits for the warm-up on the stream thread, so a hedge's budget is already running
+            self.wait_for_warm_up(pending.deadline)
+            remaining = pending.deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"LLM deadline of {Config.LLM_DEADLINE_SECONDS:g}s reached before the request")
+            attempt_messages = self.repair_messages(messages, output, error, indices)
+            return self.chat(attempt_messages, indices, stream=True, timeout=remaining)
+
+        pending = PendingSelection(
+            self.logger,
+            len(classes),
+            open_stream,
+            cutoff=Config.LLM_STREAM_CUTOFF,
+            max_attempts=Config.LLM_MAX_ATTEMPTS,
+            deadline_seconds=Config.LLM_DEADLINE_SECONDS,
+        )
+        return pending.start()
+
+    def select_with_cascade(self, classes: list[ClassInfo]) -> LLMResponse:
+        """
+        Ask the models in OLLAMA_MODELS in turn until one is sure
+
+        Every model but the last answers once, with a confidence; a failed
+        answer or one below CASCADE_MIN_CONFIDENCE escalates to the next.
+        The last model gets the usual repair retries and always decides.
+
+        Args:
+            classes: List of ClassInfo objects
+
+        Returns:
+            LLMResponse from the first model that was confident enough
+        """
+        tiers = []
+        try:
+            for model in self.models[:-1]:
+                start = time.perf_counter()
+                try:
+                    response = self.select_with_llm(classes, model=model, confidence=True, max_attempts=1)
+                    tier = TierResult(
+                        model, (time.perf_counter() - start) * 1000, response.selected_index, response.confidence
+                    )
+                except Exception as e:
+                    tier = TierResult(model, (time.perf_counter() - start) * 1000, error=str(e))
+                tiers.append(tier)
+                if tier.accepted:
+                    return response
+                reason = tier.error or f"confidence {tier.confidence or 0:.2f} < {Config.CASCADE_MIN_CONFIDENCE}"
+                self.logger.info(f"Escalating from {model}: {reason}")
+
+            model = self.models[-1]
+            start = time.perf_counter()
+            try:
+                response = self.select_with_llm(classes, model=model)
+            except Exception as e:
+                tiers.append(TierResult(model, (time.perf_counter() - start) * 1000, error=str(e)))
+                raise
+            tiers.append(TierResult(model, (time.perf_counter() - start) * 1000, response.selected_index))
+            return response
+        finally:
+            self.cascade_stats.record(tiers)
+
+    def select_with_llm(
+        self, classes: list[ClassInfo], model: str = None, confidence: bool = False, max_attempts: int = None
+    ) -> LLMResponse:
+        """
+        Use LLM to select the best class from available options
+
+        Malformed or out-of-range answers are re-asked with the error
+        attached, up to LLM_MAX_ATTEMPTS within LLM_DEADLINE_SECONDS. The
+        deadline includes waiting for the warm-up; each attempt may use only
+        what is left of it, and none starts once it has passed.
+
+        Args:
+            classes: List of ClassInfo objects
+            model: Ollama model (default: the last one in OLLAMA_MODELS)
+            confidence: Also ask the model how sure it is
+            max_attempts: Override LLM_MAX_ATTEMPTS
+
+        Returns:
+            LLMResponse with selected_index, reasoning, and notify_user flag
+        """
+        model = model or self.models[-1]
+        listed = self.prompts.fit_budget(classes)
+        indices = [c.index for c in listed]
+        messages = self.prompts.messages(listed, confidence=confidence)
+
+        self.logger.info(f"Sending {len(classes)} classes to {model} for selection")
+        self.logger.debug(f"Classes:\n{messages[-1]['content']}")
+
+        deadline = time.monotonic() + Config.LLM_DEADLINE_SECONDS
+        self.wait_for_warm_up(deadline)
+
+        output, error = None, None
+        retry_ms = 0.0
+        attempts = 0
+        for attempt in range(1, (max_attempts or Config.LLM_MAX_ATTEMPTS) + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                error = error or TimeoutError(f"LLM deadline of {Config.LLM_DEADLINE_SECONDS:g}s reached")
+                break
+            attempts = attempt
+            attempt_start = time.perf_counter()
+            attempt_messages = self.repair_messages(messages, output, error, indices)
+            output = None
+            try:
+                response = self.chat(attempt_messages, indices, model=model, confidence=confidence, timeout=remaining)
+                output = response["message"]["content"]
+                self.logger.debug(f"LLM raw response: {output}")
+
+                llm_response = LLMResponse.from_dict(json.loads(output))
+                if llm_response.selected_index not in indices:
+                    raise ValueError(f"LLM selected index {llm_response.selected_index}, which was not listed")
+
+                confidence_note = f" (confidence {llm_response.confidence:.2f})" if llm_response.confidence is not None else ""
+                self.logger.info(f"{model} selected class #{llm_response.selected_index}{confidence_note}")
+                self.log_durations("selection", response)
+                if attempt > 1:
+                    self.logger.info(f"LLM retries: {attempt - 1} (+{retry_ms:.0f}ms)")
+                return llm_response
+
+            except Exception as e:
+                error = e
+                self.logger.warning(f"LLM attempt {attempt} failed: {e}")
+                retry_ms += (time.perf_counter() - attempt_start) * 1000
+
+        self.logger.error(f"Error during LLM selection: {error}")
+        raise Exception(f"LLM selection failed after {attempts} attempts: {error}")
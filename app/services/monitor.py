@@ -0,0 +1,181 @@
+"""Watches a full class and books it the moment a spot opens"""
+
+import time
+import logging
+from datetime import datetime
+from typing import Optional
+
+from app.config import Config
+from app.models import ClassInfo
+from app.services.browser import BrowserService, CLASS_ROW_SELECTOR
+
+# Button state of just the watched rows, matched on class name and start time.
+# Reads the same cells as EXTRACT_CLASSES_JS and compares them exactly, so a
+# 7:00 AM target never matches a 10:00 AM row or a class ending at 7:00 AM.
+READ_ROWS_JS = """
+([selector, targets]) => {
+    const text = (el) => (el ? el.innerText.trim() : "");
+    const rows = Array.from(document.querySelectorAll(selector)).map((row) => ({
+        row,
+        name: text(row.querySelector(".font-size-m span")),
+        start: text(row.querySelector(".list-item-content-left")).split("\\n")[0].split(" - ")[0].trim(),
+    }));
+    return targets.map(([name, start]) => {
+        const match = rows.find((r) => r.name === name && r.start === start);
+        const row = match ? match.row : null;
+        const button = row ? row.querySelector("button") : null;
+        return button ? {button_id: button.getAttribute("id"), button_text: button.innerText} : null;
+    });
+}
+"""
+
+
+def class_start(date: datetime, class_info: ClassInfo) -> Optional[datetime]:
+    """Start time of a class on the given date (its feed start_date if it has one)"""
+    if class_info.start_date:
+        return class_info.start_date
+    if class_info.start is None:
+        return None
+    return date.replace(hour=class_info.start // 60, minute=class_info.start % 60, second=0, microsecond=0)
+
+
+def poll_interval(seconds_to_class: float) -> float:
+    """
+    Seconds to wait before the next poll
+
+    Spots open up more often as class time approaches (late cancellations),
+    so the interval shrinks in proportion to the time remaining.
+    """
+    interval = seconds_to_class * Config.MONITOR_BACKOFF_FRACTION
+    return min(max(interval, Config.MONITOR_MIN_INTERVAL), Config.MONITOR_MAX_INTERVAL)
+
+
+class AvailabilityMonitor:
+    """
+    Re-polls one date on a logged-in BrowserService until a watched class opens
+
+    Each poll reloads the page and selects the date again, so the class
+    list is really fetched afresh, then reads only the watched rows (from
+    the data feed when CLASS_SOURCE=feed, otherwise with a single evaluate
+    over the rendered rows). A failed poll is followed by a recovery and
+    the usual wait before the next one.
+    """
+
+    def __init__(self, logger: logging.Logger, browser: BrowserService):
+        self.logger = logger
+        self.browser = browser
+        self.polls = 0
+        self.poll_ms: list[float] = []
+        self.errors = 0
+        self.detected_at: Optional[float] = None
+
+    def read_targets(self, targets: list[ClassInfo]) -> list[ClassInfo]:
+        """Current state of the watched classes (unchanged entries if a row is missing)"""
+        if self.browser.feed_classes:
+            current = {(c.class_name, c.time_range): c for c in self.browser.feed_classes}
+            return [current.get((t.class_name, t.time_range), t) for t in targets]
+
+        keys = [[t.class_name.strip(), t.time_range.split(" - ")[0].strip()] for t in targets]
+        states = self.browser.page.evaluate(READ_ROWS_JS, [CLASS_ROW_SELECTOR, keys])
+        updated = []
+        for target, state in zip(targets, states):
+            if state:
+                target.update_button(state["button_id"], state["button_text"])
+            updated.append(target)
+        return updated
+
+    def poll(self, date_str: str, targets: list[ClassInfo]) -> Optional[ClassInfo]:
+        """Refresh the date and return the first watched class that is bookable"""
+        self.polls += 1
+        started = time.perf_counter()
+        try:
+            self.browser.refresh_date(date_str, Config.MONITOR_RESPONSE_TIMEOUT)
+            for target in self.read_targets(targets):
+                if target.is_bookable():
+                    return target
+            return None
+        finally:
+            self.poll_ms.append((time.perf_counter() - started) * 1000)
+
+    def recover(self) -> bool:
+        """
+        Reload the calendar after a failed poll, logging back in if the session lapsed
+
+        Returns:
+            True if the calendar is back, False if recovery failed too
+        """
+        self.errors += 1
+        try:
+            self.browser.page.reload(wait_until="domcontentloaded")
+            if not self.browser.has_valid_session():
+                self.browser.full_login()
+            self.browser.navigate_to_calendar()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Recovery after poll {self.polls} failed: {e}")
+            return False
+
+    def watch(self, date: datetime, date_str: str, targets: list[ClassInfo]) -> Optional[ClassInfo]:
+        """
+        Poll until a watched class can be booked, then book it
+
+        Args:
+            date: Target date (used to work out how far away each class is)
+            date_str: Date string in "M/D" format
+            targets: Classes to watch, in order of preference
+
+        Returns:
+            The booked class, or None if every class started (minus
+            MONITOR_CUTOFF_MINUTES) before a spot opened
+        """
+        cutoff = Config.MONITOR_CUTOFF_MINUTES * 60
+        end_of_day = date.replace(hour=23, minute=59).timestamp()
+        deadlines = {
+            id(t): (start.timestamp() if start else end_of_day) - cutoff
+            for t, start in ((t, class_start(date, t)) for t in targets)
+        }
+
+        names = ", ".join(f"{t.class_name} ({t.time_range})" for t in targets)
+        self.logger.info(f"Monitoring {names} on {date_str}")
+
+        while True:
+            targets = [t for t in targets if deadlines[id(t)] > time.time()]
+            if not targets:
+                break
+            try:
+                opened = self.poll(date_str, targets)
+            except Exception as e:
+                self.logger.warning(f"Poll {self.polls} failed: {e}")
+                opened = None
+                self.recover()
+
+            if opened:
+                self.detected_at = time.monotonic()
+                self.logger.info(f"Spot opened in {opened.class_name} at {opened.time_range} (poll {self.polls})")
+                try:
+                    self.browser.book_class(opened)
+                    self.report(opened)
+                    return opened
+                except Exception as e:
+                    # Someone else took the spot first; keep watching after the usual wait
+                    self.logger.warning(f"Booking the opened spot failed: {e}")
+                    self.recover()
+
+            remaining = min(deadlines[id(t)] for t in targets) - time.time()
+            wait = poll_interval(remaining)
+            self.logger.debug(f"Poll {self.polls}: still full, next in {wait:.0f}s")
+            time.sleep(min(wait, max(remaining, 0)))
+
+        self.logger.info(f"No spot opened before the cutoff after {self.polls} polls")
+        self.report(None)
+        return None
+
+    def report(self, booked: Optional[ClassInfo]):
+        """Log poll counts and detection-to-booking latency"""
+        avg_ms = sum(self.poll_ms) / len(self.poll_ms) if self.poll_ms else 0.0
+        summary = f"Monitor: {self.polls} polls (avg {avg_ms:.0f}ms, {self.errors} recoveries)"
+        if booked and self.detected_at and self.browser.last_click_at:
+            click_ms = (self.browser.last_click_at - self.detected_at) * 1000
+            confirm_ms = self.browser.step_timings.get("book", 0.0)
+            summary += f"; detection to click {click_ms:.0f}ms, booking step {confirm_ms:.0f}ms"
+        self.logger.info(summary)
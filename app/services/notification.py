@@ -72,6 +72,11 @@ class NotificationService:
         message = f"⚠️ Unusual selection\n\nBooked: {class_name}\nTime: {time_range}\n\nReason: {reasoning}"
         self.send(message, title="Wodify: Unusual Booking", priority=1)
 
+    def notify_report(self, report: str, has_failures: bool):
+        """Send a multi-date booking report"""
+        title = "Wodify: Bookings (with failures)" if has_failures else "Wodify: Bookings"
+        self.send(report, title=title, priority=1 if has_failures else 0)
+
     def notify_error(self, error_message: str):
         """Send an error notification"""
         message = f"❌ Booking failed\n\n{error_message}"
@@ -0,0 +1,135 @@
+"""Rule-based class selection for days where the answer is obvious"""
+
+import json
+import logging
+from typing import Optional
+
+from app.config import Config
+from app.models import CROSSFIT, OPEN_GYM, ClassInfo, LLMResponse, Schedule, parse_time_range
+
+# Classes longer than this are "all day" events and count as unusual
+MAX_REGULAR_MINUTES = 90
+
+
+class PreferenceEngine:
+    """
+    Encodes the system prompt's selection rules for the common case
+
+    A day is decided here only when exactly one regular "CrossFit: H:MM AM"
+    class covers the preferred window, it can be booked, and nothing unusual
+    (a named WOD, an all-day event, an unreadable time) overlaps it. Everything else goes to
+    the LLM, which handles the judgment calls and notification wording.
+    """
+
+    STATS_FILE = "selection_stats.json"
+
+    def __init__(self, logger: logging.Logger, window: str = None):
+        self.logger = logger
+        window_range = parse_time_range(window or Config.PREFERRED_WINDOW)
+        if window_range is None:
+            raise ValueError(f"Unreadable PREFERRED_WINDOW: {window or Config.PREFERRED_WINDOW}")
+        self.window_start, self.window_end = window_range
+        self.stats_path = Config.CACHE_DIR / self.STATS_FILE
+
+    def covers_window(self, start: int, end: int) -> bool:
+        """Class contains the window, or starts inside it"""
+        return (start <= self.window_start and end >= self.window_end) or self.window_start <= start < self.window_end
+
+    def select(self, classes: list[ClassInfo]) -> Optional[LLMResponse]:
+        """
+        Pick a class without the LLM if the schedule is unambiguous
+
+        Args:
+            classes: List of ClassInfo objects
+
+        Returns:
+            LLMResponse for a clear-cut day, or None to escalate to the LLM
+        """
+        schedule = Schedule(classes)
+        if schedule.untimed:
+            self.logger.debug(f"Rule engine: unreadable time '{schedule.untimed[0].time_range}', escalating")
+            return None
+
+        matches = []
+        for cls in schedule.overlapping(self.window_start, self.window_end):
+            if cls.category == OPEN_GYM:
+                continue
+            if cls.category != CROSSFIT or cls.duration > MAX_REGULAR_MINUTES:
+                self.logger.debug(f"Rule engine: unusual class '{cls.class_name}' in window, escalating")
+                return None
+            if self.covers_window(cls.start, cls.end):
+                matches.append(cls)
+
+        if len(matches) != 1:
+            self.logger.debug(f"Rule engine: {len(matches)} regular classes cover the window, escalating")
+            return None
+
+        selected = matches[0]
+        if not selected.is_bookable():
+            # Full, already booked or closed: the LLM weighs availability against the alternatives
+            self.logger.debug(f"Rule engine: '{selected.class_name}' is {selected.state}, escalating")
+            return None
+        return LLMResponse(
+            selected_index=selected.index,
+            reasoning=f"Rule match: {selected.class_name} ({selected.time_range}) is the regular CrossFit class in the preferred window.",
+            notify_user=False,
+        )
+
+    def fallback(self, classes: list[ClassInfo]) -> LLMResponse:
+        """
+        Deterministic pick for when the LLM does not answer in time
+
+        Follows the prompt's order of preference: a bookable CrossFit class
+        over OPEN GYM, then one covering the window, then the start closest
+        to it. Always flags notify_user since no judgment call was made.
+
+        Args:
+            classes: List of ClassInfo objects
+
+        Returns:
+            LLMResponse for the best heuristic match
+        """
+        schedule = Schedule(classes)
+        # (filter, whether a class with an unreadable time may be picked); those rank last, like OPEN GYM
+        preferences = [
+            (lambda c: c.is_bookable() and c.category != OPEN_GYM, False),
+            (ClassInfo.is_bookable, True),
+            (lambda c: c.category != OPEN_GYM, False),
+            (lambda c: True, True),
+        ]
+        for accept, untimed in preferences:
+            covering = [
+                c
+                for c in schedule.overlapping(self.window_start, self.window_end)
+                if accept(c) and self.covers_window(c.start, c.end)
+            ]
+            if covering:
+                selected = min(covering, key=lambda c: (abs(c.start - self.window_start), c.index))
+            else:
+                selected = schedule.nearest_start(self.window_start, accept)
+            if not selected and untimed:
+                selected = next((c for c in schedule.untimed if accept(c)), None)
+            if selected:
+                break
+        return LLMResponse(
+            selected_index=selected.index,
+            reasoning=f"LLM unavailable; heuristic picked {selected.class_name} ({selected.time_range}) as the closest match.",
+            notify_user=True,
+        )
+
+    def record(self, method: str):
+        """Count a decision by method ("rules", "cache", "llm" or "heuristic") and log the fast-path share"""
+        try:
+            stats = json.loads(self.stats_path.read_text())
+        except (OSError, ValueError):
+            stats = {}
+        stats[method] = stats.get(method, 0) + 1
+
+        total = sum(stats.values())
+        share = stats.get("rules", 0) / total * 100
+        self.logger.info(f"Selection by {method}; fast path decided {stats.get('rules', 0)}/{total} ({share:.0f}%)")
+        try:
+            Config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self.stats_path.write_text(json.dumps(stats))
+        except OSError as e:
+            self.logger.debug(f"Could not save selection stats: {e}")
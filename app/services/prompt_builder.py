@@ -0,0 +1,118 @@
+"""Builds the class selection prompt with a byte-stable system prefix"""
+
+import math
+import logging
+
+from app.config import Config
+from app.models import ClassInfo, parse_time_range
+
+# Rough chars-per-token for English/number mixes; good enough for a budget check
+CHARS_PER_TOKEN = 4
+
+BATCH_REQUEST = (
+    "Choose one class for each schedule independently. Reply with only "
+    '{"selections": [...]}, holding one answer object per schedule in the order given.'
+)
+
+CONFIDENCE_REQUEST = (
+    'Also include "confidence": a number from 0 to 1 for how clearly the preferences decide this choice.'
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class PromptBuilder:
+    """
+    Chat messages for class selection
+
+    The system prompt is read once and sent byte-for-byte identically on
+    every call, so Ollama can reuse its cached prefill for that prefix; only
+    the short class list after it varies. The compact style drops the
+    fixed-width padding, coaches and button ids that the full
+    to_display_string() rows carry.
+    """
+
+    def __init__(self, logger: logging.Logger, style: str = None):
+        self.logger = logger
+        self.style = style or Config.PROMPT_STYLE
+        self.system_prompt = Config.get_system_prompt(self.style)
+        self.window_start = (parse_time_range(Config.PREFERRED_WINDOW) or (0, 0))[0]
+
+    def format_classes(self, classes: list[ClassInfo]) -> str:
+        if self.style == "compact":
+            return "\n".join(c.to_compact_string() for c in classes)
+        return "\n".join(c.to_display_string() for c in classes)
+
+    def user_message(self, classes: list[ClassInfo]) -> str:
+        if self.style == "compact":
+            return f"Classes:\n{self.format_classes(classes)}"
+        return f"Here are the available classes:\n\n{self.format_classes(classes)}\n\nWhich class should I book?"
+
+    def _distance(self, cls: ClassInfo) -> int:
+        return abs(cls.start - self.window_start) if cls.start is not None else 0
+
+    def fit_budget(self, classes: list[ClassInfo], budget: int = None) -> list[ClassInfo]:
+        """
+        Drop the classes furthest from the preferred window until the prompt fits
+
+        Indices are kept, so the model's answer still refers to the full list.
+        Budget defaults to Config.PROMPT_TOKEN_BUDGET.
+        """
+        budget = budget or Config.PROMPT_TOKEN_BUDGET
+        kept = list(classes)
+        system_tokens = estimate_tokens(self.system_prompt)
+        while len(kept) > 1 and system_tokens + estimate_tokens(self.user_message(kept)) > budget:
+            kept.remove(max(kept, key=self._distance))
+        if len(kept) < len(classes):
+            self.logger.warning(f"Prompt over {budget} token budget, sent {len(kept)} of {len(classes)} classes")
+        return kept
+
+    def messages(self, classes: list[ClassInfo], budget: int = None, confidence: bool = False) -> list[dict]:
+        """
+        Build chat messages for a selection request
+
+        Args:
+            classes: List of ClassInfo objects
+            budget: Estimated token limit for the whole prompt (default: Config.PROMPT_TOKEN_BUDGET)
+            confidence: Also ask for a 0-1 confidence (after the class list, so the cached prefix is unchanged)
+
+        Returns:
+            System and user messages for ollama.Client.chat
+        """
+        kept = self.fit_budget(classes, budget)
+        user = self.user_message(kept)
+        if confidence:
+            user += f"\n\n{CONFIDENCE_REQUEST}"
+        self.logger.debug(
+            f"Prompt ({self.style}): ~{estimate_tokens(self.system_prompt)} system + ~{estimate_tokens(user)} class tokens"
+        )
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user},
+        ]
+
+    def batch_messages(self, schedules: list[list[ClassInfo]]) -> list[dict]:
+        """
+        Chat messages asking for one selection per schedule in a single call
+
+        The system prompt is the same as for single selections, so its
+        cached prefill is shared; each schedule keeps its own indices.
+
+        Args:
+            schedules: Independent class lists (e.g. one per date)
+
+        Returns:
+            System and user messages for ollama.Client.chat
+        """
+        blocks = [f"Schedule {i + 1}:\n{self.user_message(classes)}" for i, classes in enumerate(schedules)]
+        user = "\n\n".join(blocks) + f"\n\n{BATCH_REQUEST}"
+        self.logger.debug(
+            f"Batch prompt ({self.style}): ~{estimate_tokens(self.system_prompt)} system + "
+            f"~{estimate_tokens(user)} tokens for {len(schedules)} schedules"
+        )
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user},
+        ]
@@ -0,0 +1,100 @@
+"""Blocks non-essential page assets during automation and counts what was saved"""
+
+import re
+import json
+import logging
+from collections import Counter
+from playwright.sync_api import BrowserContext, Response, Route
+
+from app.config import Config
+
+
+class ResourceFilter:
+    """
+    Route handler that aborts asset requests the booking flow never needs
+
+    Modes (Config.RESOURCE_FILTER):
+        off     - not installed
+        observe - nothing blocked; records what *would* be blocked and the
+                  size of every response, so later blocking runs can report
+                  bytes saved
+        block   - aborts requests by resource type or URL pattern
+
+    Sizes come from Content-Length headers, so chunked responses count as 0.
+    """
+
+    SIZES_FILE = "resource_sizes.json"
+
+    def __init__(self, logger: logging.Logger, mode: str = None):
+        self.logger = logger
+        self.mode = mode or Config.RESOURCE_FILTER
+        self.blocked_types = set(Config.BLOCKED_RESOURCE_TYPES)
+        self.blocked_pattern = (
+            re.compile("|".join(Config.BLOCKED_URL_PATTERNS), re.I) if Config.BLOCKED_URL_PATTERNS else None
+        )
+        self.sizes_path = Config.CACHE_DIR / self.SIZES_FILE
+        self.known_sizes = self._load_sizes()
+
+        self.blocked = Counter()
+        self.blocked_bytes = 0
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    def _load_sizes(self) -> dict:
+        try:
+            return json.loads(self.sizes_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def install(self, context: BrowserContext):
+        """Attach the filter to a browser context"""
+        if self.mode == "off":
+            return
+        context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+        self.logger.info(f"Resource filter installed (mode: {self.mode})")
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Whether a request matches the blocking policy"""
+        if resource_type in self.blocked_types:
+            return True
+        return bool(self.blocked_pattern and self.blocked_pattern.search(url))
+
+    def _handle(self, route: Route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked[request.resource_type] += 1
+            self.blocked_bytes += self.known_sizes.get(request.url, 0)
+            if self.mode == "block":
+                route.abort()
+                return
+        route.continue_()
+
+    def _on_response(self, response: Response):
+        size = int(response.headers.get("content-length") or 0)
+        request = response.request
+        if self.mode == "observe":
+            self.known_sizes[request.url] = size
+        if not (self.mode == "block" and self.should_block(request.resource_type, request.url)):
+            self.allowed_requests += 1
+            self.allowed_bytes += size
+
+    def save(self):
+        """Persist observed response sizes for future bytes-saved estimates"""
+        if self.mode != "observe":
+            return
+        Config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.sizes_path.write_text(json.dumps(self.known_sizes))
+
+    def report(self):
+        """Log blocked request counts and bytes"""
+        if self.mode == "off":
+            return
+        verb = "Blocked" if self.mode == "block" else "Would block"
+        total_blocked = sum(self.blocked.values())
+        by_type = ", ".join(f"{t}={n}" for t, n in self.blocked.most_common()) or "none"
+        self.logger.info(
+            f"{verb} {total_blocked} requests (~{self.blocked_bytes / 1024:.0f} KB) [{by_type}]; "
+            f"allowed {self.allowed_requests} requests (~{self.allowed_bytes / 1024:.0f} KB)"
+        )
+        self.save()
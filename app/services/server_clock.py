@@ -0,0 +1,84 @@
+"""Server clock synchronisation against the HTTP Date header"""
+
+import time
+import logging
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from app.config import Config
+
+
+class ServerClock:
+    """
+    Estimates the offset between the local clock and Wodify's server clock
+
+    The Date header only has one-second resolution, so the clock polls until
+    it sees the header tick over to the next second. At that edge the server
+    time is known to within half a round-trip, which is far tighter than the
+    header's own resolution.
+    """
+
+    def __init__(self, logger: logging.Logger, url: str = None):
+        self.logger = logger
+        self.url = url or Config.WODIFY_URL
+        self.offset = 0.0  # server epoch seconds minus local epoch seconds
+        self.uncertainty = 1.0
+        self.session = requests.Session()
+
+    def _sample(self) -> tuple[float, float, float]:
+        """One request: (local send time, local receive time, server Date as epoch)"""
+        sent = time.time()
+        response = self.session.head(self.url, timeout=5, allow_redirects=False)
+        received = time.time()
+        server = parsedate_to_datetime(response.headers["Date"]).timestamp()
+        return sent, received, server
+
+    def sync(self, max_samples: int = 40) -> float:
+        """
+        Measure the clock offset
+
+        Args:
+            max_samples: Upper bound on HEAD requests while waiting for the Date header to tick
+
+        Returns:
+            Offset in seconds (positive means the server clock is ahead)
+        """
+        previous = None
+        for _ in range(max_samples):
+            sample = self._sample()
+            if previous and sample[2] > previous[2]:
+                # The tick happened between the previous reply and this one;
+                # assume it landed midway through this request's round-trip
+                sent, received, server = sample
+                self.offset = server - (sent + received) / 2
+                self.uncertainty = (received - previous[1]) / 2 + (received - sent) / 2
+                break
+            previous = sample
+            time.sleep(0.05)
+        else:
+            sent, received, server = previous
+            self.offset = server + 0.5 - (sent + received) / 2
+            self.uncertainty = 0.5 + (received - sent) / 2
+
+        self.logger.info(f"Server clock skew: {self.offset * 1000:+.0f}ms (±{self.uncertainty * 1000:.0f}ms)")
+        return self.offset
+
+    def server_time(self) -> float:
+        """Current server time as an epoch timestamp"""
+        return time.time() + self.offset
+
+    def wait_until(self, server_epoch: float, spin_ms: float = 20):
+        """
+        Block until the given server time on the monotonic clock
+
+        Sleeps coarsely, then busy-waits for the last `spin_ms` so the wake-up
+        is not at the mercy of scheduler granularity.
+        """
+        deadline = time.monotonic() + (server_epoch - self.server_time())
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if remaining > spin_ms / 1000:
+                time.sleep(remaining - spin_ms / 1000)
@@ -0,0 +1,114 @@
+"""Encrypted on-disk store for authenticated Playwright sessions"""
+
+import base64
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.config import Config
+
+
+class SessionStore:
+    """
+    Persists Playwright storage_state (cookies + localStorage) per account
+
+    Each account gets its own encrypted file so a cron run can restore the
+    previous login instead of walking through the full login flow again.
+    Hit/miss/expiry counters are kept in a plain JSON file next to the
+    sessions (no secrets in it) so they accumulate across runs.
+    """
+
+    STATS_FILE = "stats.json"
+
+    def __init__(self, logger: logging.Logger, account: str, secret: Optional[str] = None):
+        self.logger = logger
+        self.account = account
+        self.directory: Path = Config.SESSION_DIR
+        self.max_age_seconds = Config.SESSION_MAX_AGE_HOURS * 3600
+        self.account_key = hashlib.sha256(account.lower().encode()).hexdigest()[:16]
+        self.path = self.directory / f"{self.account_key}.session"
+        self.fernet = Fernet(self._derive_key(secret or Config.SESSION_SECRET or Config.WODIFY_PASSWORD))
+
+    def _derive_key(self, secret: str) -> bytes:
+        """Derive a Fernet key from the configured secret, salted by account"""
+        raw = hashlib.pbkdf2_hmac("sha256", secret.encode(), self.account_key.encode(), 200_000)
+        return base64.urlsafe_b64encode(raw)
+
+    def load(self) -> Optional[dict]:
+        """
+        Load the stored session for this account
+
+        Returns:
+            Playwright storage_state dict, or None if missing/unreadable/too old
+        """
+        if not self.path.exists():
+            self.logger.info("No saved session found")
+            self._record("misses")
+            return None
+
+        try:
+            payload = json.loads(self.fernet.decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError) as e:
+            self.logger.warning(f"Saved session unreadable, discarding: {e}")
+            self.clear()
+            self._record("misses")
+            return None
+
+        age = time.time() - payload.get("saved_at", 0)
+        if age > self.max_age_seconds:
+            self.logger.info(f"Saved session too old ({age / 3600:.1f}h), discarding")
+            self.clear()
+            self._record("expired")
+            return None
+
+        self.logger.info(f"Restoring saved session ({age / 3600:.1f}h old)")
+        return payload["storage_state"]
+
+    def save(self, storage_state: dict):
+        """Encrypt and persist a storage_state for this account"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"saved_at": time.time(), "storage_state": storage_state})
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(self.fernet.encrypt(payload.encode()))
+        tmp_path.chmod(0o600)
+        tmp_path.replace(self.path)
+        self.logger.info("Session saved for reuse")
+
+    def clear(self):
+        """Delete the stored session for this account"""
+        self.path.unlink(missing_ok=True)
+
+    def record_hit(self):
+        """Record that a restored session was still valid"""
+        self._record("hits")
+
+    def record_expired(self):
+        """Record that a restored session was rejected by Wodify"""
+        self.clear()
+        self._record("expired")
+
+    def stats(self) -> dict:
+        """Cumulative hit/miss/expiry counts for this account"""
+        all_stats = self._read_stats()
+        return all_stats.get(self.account_key, {"hits": 0, "misses": 0, "expired": 0})
+
+    def _read_stats(self) -> dict:
+        stats_path = self.directory / self.STATS_FILE
+        if not stats_path.exists():
+            return {}
+        try:
+            return json.loads(stats_path.read_text())
+        except ValueError:
+            return {}
+
+    def _record(self, counter: str):
+        all_stats = self._read_stats()
+        account_stats = all_stats.setdefault(self.account_key, {"hits": 0, "misses": 0, "expired": 0})
+        account_stats[counter] += 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / self.STATS_FILE).write_text(json.dumps(all_stats, indent=2))
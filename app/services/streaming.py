@@ -0,0 +1,244 @@
+"""Streaming class selection: act on selected_index before the LLM finishes talking"""
+
+import re
+import json
+import time
+import logging
+import threading
+from typing import Any, Callable, Iterator, Optional
+
+from app.models import LLMResponse
+
+INDEX_PATTERN = re.compile(r'"selected_index"\s*:\s*(-?\d+)\s*[,}\s]')
+NOTIFY_PATTERN = re.compile(r'"notify_user"\s*:\s*(true|false)')
+REASONING_PATTERN = re.compile(r'"reasoning"\s*:\s*"((?:[^"\\]|\\.)*)"', re.S)
+
+
+class IncrementalJSONParser:
+    """
+    Pulls LLMResponse fields out of a JSON object as it streams in
+
+    Fields are reported as soon as their value is complete, in whatever order
+    the model emits them. Anything before the first "{" (e.g. thinking text)
+    is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.selected_index: Optional[int] = None
+        self.reasoning: Optional[str] = None
+        self.notify_user: Optional[bool] = None
+
+    def feed(self, chunk: str):
+        self.buffer += chunk
+        start = self.buffer.find("{")
+        if start < 0:
+            return
+        text = self.buffer[start:]
+        if self.selected_index is None:
+            match = INDEX_PATTERN.search(text)
+            if match:
+                self.selected_index = int(match.group(1))
+        if self.notify_user is None:
+            match = NOTIFY_PATTERN.search(text)
+            if match:
+                self.notify_user = match.group(1) == "true"
+        if self.reasoning is None:
+            match = REASONING_PATTERN.search(text)
+            if match:
+                self.reasoning = json.loads(f'"{match.group(1)}"')
+
+    def complete(self) -> dict:
+        """The whole object once the stream has ended"""
+        return json.loads(self.buffer[self.buffer.find("{"):])
+
+
+class PendingSelection:
+    """
+    A class selection that may still be generating
+
+    decision() returns the index as soon as it is known; result() waits for
+    the full LLMResponse. With cutoff=True the stream is closed right after
+    the index arrives (Ollama stops generating), and the response carries a
+    placeholder reasoning with notify_user=True since the model never said.
+
+    A failed attempt before the index is known is retried (up to
+    max_attempts, within deadline_seconds) by calling
+    open_stream(previous_output, previous_error), so the caller can ask the
+    model to repair its answer. After the index is known a broken tail is
+    patched from the fields parsed so far instead.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        num_classes: int,
+        open_stream: Optional[Callable[[Optional[str], Optional[Exception]], Iterator[Any]]] = None,
+        cutoff: bool = False,
+        max_attempts: int = 1,
+        deadline_seconds: float = 60.0,
+    ):
+        self.logger = logger
+        self.num_classes = num_classes
+        self.open_stream = open_stream
+        self.cutoff = cutoff
+        self.max_attempts = max_attempts
+        self.deadline_seconds = deadline_seconds
+        self.deadline = time.monotonic() + deadline_seconds
+        self.retries = 0
+        self.retry_ms = 0.0
+        self.parser = IncrementalJSONParser()
+        self.index: Optional[int] = None
+        self.response: Optional[LLMResponse] = None
+        self.error: Optional[Exception] = None
+        self.stopped_early = False
+        self.superseded = False  # A hedge booked something else before this answered
+        self.final_chunk: Optional[Any] = None
+        self.started_at = time.perf_counter()
+        self.decision_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.decided = threading.Event()
+        self.done = threading.Event()
+        self._callbacks: list[Callable[[LLMResponse, Any], None]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def resolved(cls, logger: logging.Logger, response: LLMResponse) -> "PendingSelection":
+        """A selection that is already known (rule engine, cache, or a non-streaming call)"""
+        pending = cls(logger, num_classes=0)
+        pending.index = response.selected_index
+        pending.response = response
+        pending.decision_ms = pending.total_ms = 0.0
+        pending.decided.set()
+        pending.done.set()
+        return pending
+
+    @classmethod
+    def background(cls, logger: logging.Logger, select: Callable[[], LLMResponse]) -> "PendingSelection":
+        """Run a blocking selection (the non-streaming LLM call) on a thread"""
+        pending = cls(logger, num_classes=0)
+
+        def run():
+            try:
+                pending.response = select()
+                pending.index = pending.response.selected_index
+                pending.decision_ms = (time.perf_counter() - pending.started_at) * 1000
+            except Exception as e:
+                pending.error = e
+            finally:
+                pending.total_ms = (time.perf_counter() - pending.started_at) * 1000
+                pending._finish()
+
+        threading.Thread(target=run, name="llm-select", daemon=True).start()
+        return pending
+
+    def start(self):
+        threading.Thread(target=self._consume, name="llm-stream", daemon=True).start()
+        return self
+
+    def on_complete(self, callback: Callable[[LLMResponse, Any], None]):
+        """Run callback(response, final_chunk) once generation finishes normally (not on cutoff or error)"""
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        if self.error is None and not self.stopped_early:
+            callback(self.response, self.final_chunk)
+
+    def _decide(self, index: int):
+        if not 0 <= index < self.num_classes:
+            raise ValueError(f"LLM selected invalid index {index} (valid range: 0-{self.num_classes - 1})")
+        self.index = index
+        self.decision_ms = (time.perf_counter() - self.started_at) * 1000
+        self.logger.info(f"LLM decided #{index} after {self.decision_ms:.0f}ms (streaming)")
+        self.decided.set()
+
+    def _partial_response(self) -> LLMResponse:
+        """Best-effort response once the index is known but the rest of the JSON is unusable"""
+        notify_user = True if self.parser.notify_user is None else self.parser.notify_user
+        return LLMResponse(self.index, self.parser.reasoning or "(reasoning could not be parsed)", notify_user)
+
+    def _attempt(self, previous_output: Optional[str], previous_error: Optional[Exception]) -> bool:
+        """One streamed request; True if it ended early because of the cutoff"""
+        stream = self.open_stream(previous_output, previous_error)
+        try:
+            for chunk in stream:
+                if time.monotonic() > self.deadline:
+                    raise TimeoutError(f"LLM deadline of {self.deadline_seconds:.0f}s exceeded")
+                self.parser.feed(chunk["message"]["content"])
+                index = self.parser.selected_index
+                if index is not None and self.index is None:
+                    self._decide(index)
+                    if self.cutoff:
+                        self.response = LLMResponse(index, "Generation stopped once the class was chosen.", True)
+                        return True
+                if chunk.get("done"):
+                    self.final_chunk = chunk
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+
+        self.logger.debug(f"LLM raw response: {self.parser.buffer}")
+        self.response = LLMResponse.from_dict(self.parser.complete())
+        if self.index is None:
+            self._decide(self.response.selected_index)
+        return False
+
+    def _consume(self):
+        output, error = None, None
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                attempt_start = time.perf_counter()
+                self.parser = IncrementalJSONParser()
+                try:
+                    self.stopped_early = self._attempt(output, error)
+                    return
+                except Exception as e:
+                    if self.index is not None:
+                        # Booking already started on this index; keep it rather than re-ask
+                        self.logger.warning(f"LLM response incomplete after decision ({e}), keeping #{self.index}")
+                        self.response = self._partial_response()
+                        return
+                    output, error = self.parser.buffer, e
+                    self.logger.warning(f"LLM attempt {attempt} failed: {e}")
+                    if attempt == self.max_attempts or time.monotonic() >= self.deadline:
+                        raise
+                    self.retries += 1
+                    self.retry_ms += (time.perf_counter() - attempt_start) * 1000
+        except Exception as e:
+            self.error = e
+        finally:
+            self.total_ms = (time.perf_counter() - self.started_at) * 1000
+            if self.decision_ms is not None:
+                self.logger.info(
+                    f"LLM stream {'stopped' if self.stopped_early else 'finished'} after {self.total_ms:.0f}ms "
+                    f"(decision at {self.decision_ms:.0f}ms)"
+                )
+            if self.retries:
+                self.logger.info(f"LLM retries: {self.retries} (+{self.retry_ms:.0f}ms)")
+            self._finish()
+
+    def _finish(self):
+        with self._lock:
+            self.done.set()
+            callbacks = list(self._callbacks)
+        self.decided.set()
+        if self.error is None and not self.stopped_early:
+            for callback in callbacks:
+                callback(self.response, self.final_chunk)
+
+    def decision(self, timeout: Optional[float] = None) -> int:
+        """Block until selected_index is known"""
+        if not self.decided.wait(timeout):
+            raise TimeoutError("LLM did not choose a class in time")
+        if self.index is None:
+            raise self.error or Exception("LLM stream ended without a selection")
+        return self.index
+
+    def result(self, timeout: Optional[float] = None) -> LLMResponse:
+        """Block until the full response is available"""
+        if not self.done.wait(timeout):
+            raise TimeoutError("LLM did not finish in time")
+        if self.error:
+            raise self.error
+        return self.response
@@ -0,0 +1,192 @@
+"""Event-driven page readiness waits with per-wait timing"""
+
+import re
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+from playwright.sync_api import Error, ElementHandle, Locator, Page, Response
+
+from app.config import Config
+
+
+@dataclass
+class WaitTiming:
+    """How long a single readiness wait took"""
+
+    name: str
+    elapsed_ms: float
+    succeeded: bool
+
+
+class PageWaiter:
+    """
+    Waits for concrete page signals instead of sleeping
+
+    Every wait has a deadline (defaulting to Config.ELEMENT_WAIT_TIMEOUT for
+    elements and Config.PAGE_LOAD_TIMEOUT for navigation/network) and is
+    recorded so the run log shows what the site actually needed.
+    """
+
+    def __init__(self, page: Page, logger: logging.Logger):
+        self.page = page
+        self.logger = logger
+        self.timings: list[WaitTiming] = []
+
+    def _timed(self, name: str, wait: Callable):
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            result = wait()
+            succeeded = True
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.timings.append(WaitTiming(name, elapsed_ms, succeeded))
+            self.logger.debug(f"Wait '{name}' {'ok' if succeeded else 'FAILED'} after {elapsed_ms:.0f}ms")
+
+    def for_visible(self, target: Union[str, Locator], name: str, timeout: Optional[int] = None) -> Locator:
+        """
+        Wait for an element to become visible
+
+        Args:
+            target: CSS selector or Locator
+            name: Label for the timing report
+            timeout: Deadline in ms (default: Config.ELEMENT_WAIT_TIMEOUT)
+
+        Returns:
+            The first matching Locator
+        """
+        locator = self.page.locator(target) if isinstance(target, str) else target
+        locator = locator.first
+        self._timed(name, lambda: locator.wait_for(state="visible", timeout=timeout or Config.ELEMENT_WAIT_TIMEOUT))
+        return locator
+
+    def for_hidden(self, target: Union[str, Locator], name: str, timeout: Optional[int] = None):
+        """Wait for an element to disappear (e.g. a dialog closing)"""
+        locator = self.page.locator(target) if isinstance(target, str) else target
+        self._timed(
+            name, lambda: locator.first.wait_for(state="hidden", timeout=timeout or Config.PAGE_LOAD_TIMEOUT)
+        )
+
+    def for_response(
+        self, url_pattern: str, action: Callable, name: str, timeout: Optional[int] = None
+    ) -> Response:
+        """
+        Run an action and wait for the XHR/fetch response it triggers
+
+        Args:
+            url_pattern: Regex matched against the response URL
+            action: Callable that triggers the request (e.g. a click)
+            name: Label for the timing report
+            timeout: Deadline in ms (default: Config.PAGE_LOAD_TIMEOUT)
+
+        Returns:
+            The matching Playwright Response
+        """
+        pattern = re.compile(url_pattern)
+
+        def wait():
+            with self.page.expect_response(
+                lambda r: bool(pattern.search(r.url)), timeout=timeout or Config.PAGE_LOAD_TIMEOUT
+            ) as response_info:
+                action()
+            return response_info.value
+
+        return self._timed(name, wait)
+
+    def for_condition(
+        self, condition: Callable[[], Any], name: str, timeout: Optional[int] = None, poll_ms: int = 50
+    ) -> Any:
+        """
+        Poll a Python-side condition until it returns something truthy
+
+        Args:
+            condition: Callable returning a truthy value once ready
+            name: Label for the timing report
+            timeout: Deadline in ms (default: Config.ELEMENT_WAIT_TIMEOUT)
+            poll_ms: Delay between checks
+
+        Returns:
+            The condition's truthy result
+        """
+        deadline = time.monotonic() + (timeout or Config.ELEMENT_WAIT_TIMEOUT) / 1000
+
+        def wait():
+            while True:
+                result = condition()
+                if result:
+                    return result
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Condition '{name}' not met")
+                self.page.wait_for_timeout(poll_ms)
+
+        return self._timed(name, wait)
+
+    def for_replaced(self, handle: ElementHandle, text: str, name: str, timeout: Optional[int] = None):
+        """
+        Wait until an element is detached or its text is no longer `text`
+
+        Used on the first row of a list that is about to be re-rendered, so
+        the old rows are not mistaken for the new ones.
+
+        Args:
+            handle: The element as it was before the action
+            text: Its innerText before the action
+            name: Label for the timing report
+            timeout: Deadline in ms (default: Config.ELEMENT_WAIT_TIMEOUT)
+        """
+        def replaced():
+            try:
+                return handle.evaluate("(el, text) => !el.isConnected || el.innerText !== text", text)
+            except Error:
+                return True  # Its document is gone (the page navigated)
+
+        self.for_condition(replaced, name, timeout)
+
+    def for_row_count_settled(
+        self, selector: str, name: str, settle_ms: Optional[int] = None, timeout: Optional[int] = None
+    ) -> int:
+        """
+        Wait until at least one row exists and the row count stops changing
+
+        Args:
+            selector: CSS selector for the rows
+            name: Label for the timing report
+            settle_ms: How long the count must stay unchanged (default: Config.CALENDAR_SETTLE_MS)
+            timeout: Deadline in ms (default: Config.PAGE_LOAD_TIMEOUT)
+
+        Returns:
+            The settled row count
+        """
+        settle_ms = settle_ms if settle_ms is not None else Config.CALENDAR_SETTLE_MS
+        deadline = time.monotonic() + (timeout or Config.PAGE_LOAD_TIMEOUT) / 1000
+
+        def wait():
+            rows = self.page.locator(selector)
+            last_count = -1
+            stable_since = time.monotonic()
+            while time.monotonic() < deadline:
+                count = rows.count()
+                if count != last_count:
+                    last_count = count
+                    stable_since = time.monotonic()
+                elif count > 0 and (time.monotonic() - stable_since) * 1000 >= settle_ms:
+                    return count
+                self.page.wait_for_timeout(100)
+            raise TimeoutError(f"Row count for '{selector}' did not settle (last count: {last_count})")
+
+        return self._timed(name, wait)
+
+    def total_ms(self) -> float:
+        """Total time spent waiting"""
+        return sum(t.elapsed_ms for t in self.timings)
+
+    def report(self):
+        """Log every recorded wait and the total"""
+        if not self.timings:
+            return
+        self.logger.info(f"Readiness waits ({len(self.timings)}, {self.total_ms():.0f}ms total):")
+        for timing in self.timings:
+            status = "ok" if timing.succeeded else "FAILED"
+            self.logger.info(f"  {timing.name:30s} {timing.elapsed_ms:7.0f}ms  {status}")
@@ -0,0 +1,26 @@
+"""Timing helpers for per-step performance reporting"""
+
+import time
+import functools
+
+
+def timed_step(name: str):
+    """
+    Decorator that records a method's wall time in self.step_timings[name] (ms)
+
+    Args:
+        name: Step name used in the timing report
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.step_timings[name] = (time.perf_counter() - start) * 1000
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single page.evaluate extraction vs per-row locator extraction
+Usage: python scripts/bench_extract_classes.py [saved_calendar.html] [--runs N]
+
+Without a saved page, a synthetic calendar using the same markup that
+BrowserService.extract_classes() relies on is generated.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import statistics
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+from app.services.browser import BrowserService
+
+
+def synthetic_calendar(row_count: int = 15) -> str:
+    """Build a calendar page with the .list-item[data-list-item] row markup"""
+    rows = []
+    for i in range(row_count):
+        hour = 5 + i
+        start = f"{(hour - 1) % 12 + 1}:00 {'AM' if hour < 12 else 'PM'}"
+        end = f"{hour % 12 + 1}:00 {'AM' if hour + 1 < 12 else 'PM'}"
+        rows.append(f"""
+        <div class="list-item" data-list-item="">
+          <div class="list-item-content-left"><span class="font-semi-bold">{start}</span> - {end}<br>60 min</div>
+          <div class="list-item-content">
+            <div class="font-size-m"><span>CrossFit: {start}</span></div>
+            <a href="#">Coach {i}</a>
+          </div>
+          <button id="b4-b5-l2-593_{i}-button_reservationOpen">BOOK</button>
+        </div>""")
+    return f"<html><body><div class='list'>{''.join(rows)}</div></body></html>"
+
+
+def time_runs(extract, runs: int) -> list[float]:
+    """Run an extraction function `runs` times and return timings in ms"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        extract()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("html", nargs="?", help="Saved calendar page (page.content() dump)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=15, help="Rows in the synthetic page")
+    args = parser.parse_args()
+
+    html = Path(args.html).read_text() if args.html else synthetic_calendar(args.rows)
+    logger = logging.getLogger("bench")
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
+        page = browser.new_page()
+        page.set_content(html)
+
+        service = BrowserService(logger)
+        service.page = page
+
+        evaluate_classes = service._extract_classes_evaluate()
+        locator_classes = service._extract_classes_locator()
+        if evaluate_classes != locator_classes:
+            print("WARNING: extraction paths disagree on this page")
+
+        print(f"Rows: {len(locator_classes)}, runs: {args.runs}")
+        print("=" * 50)
+        results = {
+            "evaluate": time_runs(service._extract_classes_evaluate, args.runs),
+            "locator": time_runs(service._extract_classes_locator, args.runs),
+        }
+        for name, timings in results.items():
+            print(f"{name:10s} median {statistics.median(timings):8.1f}ms   min {min(timings):8.1f}ms")
+
+        speedup = statistics.median(results["locator"]) / statistics.median(results["evaluate"])
+        print("=" * 50)
+        print(f"Single-call extraction is {speedup:.1f}x faster")
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Selection accuracy and latency benchmark for LLMService
+Usage: PYTHONPATH=. python scripts/bench_llm_selection.py [--stub] [--models qwen3:8b,qwen3:0.6b+qwen3:8b]
+                                                           [--styles compact,full] [--runs 3] [--streaming] [--batch]
+
+Runs every case in scripts/selection_corpus.py through
+LLMService.select_class for each model and prompt style, with the rule
+engine, decision cache and hedge turned off so only the LLM is measured.
+A "+" joins models into a cascade (see OLLAMA_MODELS). Reports index and
+notify_user accuracy, p50/p95 latency, generation tokens/s and model load
+time. --batch instead compares decisions/s of select_class one schedule at
+a time against one select_batch call for the whole corpus. --stub starts
+scripts/stub_ollama.py instead of using OLLAMA_HOST.
+"""
+
+import math
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+from app.config import Config
+from app.services.llm import LLMService
+from scripts.selection_corpus import CASES
+from scripts.stub_ollama import start_stub_ollama
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def record_responses(service: LLMService, responses: list):
+    """Wrap service.chat so every final Ollama response (or last stream chunk) lands in `responses`"""
+    chat = service.chat
+
+    def recorded(*args, **kwargs):
+        response = chat(*args, **kwargs)
+        if not kwargs.get("stream"):
+            responses.append(response)
+            return response
+
+        def chunks():
+            for chunk in response:
+                if chunk.get("done"):
+                    responses.append(chunk)
+                yield chunk
+
+        return chunks()
+
+    service.chat = recorded
+
+
+def load_time_ms(service: LLMService) -> float:
+    """Unload, then time a cold load of each model in the cascade"""
+    total = 0.0
+    for model in service.models:
+        service.client.generate(model=model, prompt="", keep_alive=0)
+        response = service.warm_client.generate(model=model, prompt="", keep_alive=Config.OLLAMA_KEEP_ALIVE)
+        total += (response.get("load_duration") or 0) / 1e6
+    return total
+
+
+def bench(logger: logging.Logger, models: list[str], style: str, runs: int) -> dict:
+    """Run the corpus `runs` times against one model (or cascade) and prompt style"""
+    Config.OLLAMA_MODELS = models
+    Config.PROMPT_STYLE = style
+    service = LLMService(logger)
+    load_ms = load_time_ms(service)
+
+    responses = []
+    record_responses(service, responses)
+    timings, correct, notify_correct, notify_checked, failures = [], 0, 0, 0, 0
+    for _ in range(runs):
+        for case in CASES:
+            start = time.perf_counter()
+            try:
+                result = service.select_class(case.classes)
+            except Exception as e:
+                logger.warning(f"{case.name}: {e}")
+                failures += 1
+                continue
+            timings.append((time.perf_counter() - start) * 1000)
+            correct += result.selected_index in case.expected
+            if case.notify is not None:
+                notify_checked += 1
+                notify_correct += result.notify_user == case.notify
+            if result.selected_index not in case.expected:
+                logger.info(f"{case.name}: chose #{result.selected_index}, expected {sorted(case.expected)}")
+
+    eval_tokens = sum(r.get("eval_count") or 0 for r in responses)
+    eval_seconds = sum(r.get("eval_duration") or 0 for r in responses) / 1e9
+    total = runs * len(CASES)
+    return {
+        "accuracy": correct / total,
+        "notify": notify_correct / notify_checked if notify_checked else 0.0,
+        "failures": failures,
+        "p50": percentile(timings, 50) if timings else 0.0,
+        "p95": percentile(timings, 95) if timings else 0.0,
+        "mean": statistics.mean(timings) if timings else 0.0,
+        "tokens_per_s": eval_tokens / eval_seconds if eval_seconds else 0.0,
+        "load_ms": load_ms,
+    }
+
+
+def bench_batch(logger: logging.Logger, models: list[str], style: str, runs: int) -> dict:
+    """Decisions per second for the whole corpus, one select_class at a time vs one select_batch"""
+    Config.OLLAMA_MODELS = models
+    Config.PROMPT_STYLE = style
+    service = LLMService(logger)
+    service.warm_up()
+    schedules = [case.classes for case in CASES]
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        single = [service.select_class(classes) for classes in schedules]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        batched = service.select_batch(schedules)
+    batch_s = time.perf_counter() - start
+
+    decisions = runs * len(schedules)
+    return {
+        "single": decisions / single_s,
+        "batch": decisions / batch_s,
+        "single_accuracy": sum(r.selected_index in c.expected for r, c in zip(single, CASES)) / len(CASES),
+        "batch_accuracy": sum(r.selected_index in c.expected for r, c in zip(batched, CASES)) / len(CASES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", default=",".join(Config.OLLAMA_MODELS), help='Comma-separated; "a+b" is a cascade')
+    parser.add_argument("--styles", default="compact,full")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--streaming", action="store_true", help="Use the streamed path (default: one response)")
+    parser.add_argument("--batch", action="store_true", help="Compare one-at-a-time and batched throughput")
+    parser.add_argument("--stub", action="store_true", help="Benchmark against a local stub Ollama server")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format="%(message)s")
+    logger = logging.getLogger("bench_llm")
+
+    if args.stub:
+        server, _ = start_stub_ollama()
+        Config.OLLAMA_HOST = f"http://127.0.0.1:{server.server_port}"
+    Config.RULE_FAST_PATH = False
+    Config.DECISION_CACHE = False
+    Config.LLM_BUDGET_SECONDS = 0
+    Config.LLM_STREAMING = args.streaming
+    Config.CACHE_DIR = Path(tempfile.mkdtemp(prefix="bench_llm_"))  # Keep selection stats out of the real cache
+
+    print(f"Host: {Config.OLLAMA_HOST}{' (stub)' if args.stub else ''}")
+    print(f"Cases: {len(CASES)}, runs: {args.runs}, streaming: {args.streaming}\n")
+    if args.batch:
+        print(f"{'model':28s} {'style':8s} {'single/s':>9s} {'batch/s':>8s} {'speedup':>8s} {'single acc':>10s} {'batch acc':>9s}")
+        for spec in args.models.split(","):
+            models = [m.strip() for m in spec.split("+") if m.strip()]
+            for style in args.styles.split(","):
+                r = bench_batch(logger, models, style.strip(), args.runs)
+                print(
+                    f"{spec:28s} {style:8s} {r['single']:9.2f} {r['batch']:8.2f} {r['batch'] / r['single']:7.1f}x "
+                    f"{r['single_accuracy'] * 100:9.0f}% {r['batch_accuracy'] * 100:8.0f}%"
+                )
+        return
+
+    print(
+        f"{'model':28s} {'style':8s} {'accuracy':>8s} {'notify':>7s} {'failed':>6s} "
+        f"{'p50 ms':>8s} {'p95 ms':>8s} {'tok/s':>7s} {'load ms':>8s}"
+    )
+    for spec in args.models.split(","):
+        models = [m.strip() for m in spec.split("+") if m.strip()]
+        for style in args.styles.split(","):
+            r = bench(logger, models, style.strip(), args.runs)
+            print(
+                f"{spec:28s} {style:8s} {r['accuracy'] * 100:7.0f}% {r['notify'] * 100:6.0f}% {r['failures']:6d} "
+                f"{r['p50']:8.0f} {r['p95']:8.0f} {r['tokens_per_s']:7.1f} {r['load_ms']:8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compare prefill cost of the full and compact selection prompts
+Usage: PYTHONPATH=. python scripts/compare_prompts.py [--runs 3]
+
+Sends the same class list with each PROMPT_STYLE and prints Ollama's
+prompt_eval_count / prompt_eval_duration. The first call per style pays
+the full prefill; later calls show how much of the system prefix Ollama's
+prompt cache reuses.
+"""
+
+import argparse
+import logging
+
+import ollama
+
+from app.config import Config
+from app.models import ClassInfo
+from app.services.prompt_builder import PromptBuilder, estimate_tokens
+
+SAMPLE_CLASSES = [
+    ClassInfo(0, "5:00 AM - 6:00 AM", "OPEN GYM", "", "b4-b5-l2-593_11-button_classNoLimit", "BOOK"),
+    ClassInfo(1, "6:00 AM - 7:00 AM", "CrossFit: 6:00 AM", "Devin Leishman", "b4-b5-l2-593_12-button_reservationOpen", "BOOK"),
+    ClassInfo(2, "7:00 AM - 8:00 AM", "MURPH", "Tyler Johnson Grimes", "b4-b5-l2-593_13-button_reservationOpen", "BOOK"),
+    ClassInfo(3, "8:00 AM - 9:00 AM", "CrossFit: 8:00 AM", "Devin Leishman", "b4-b5-l2-593_14-button_reservationOpen", "BOOK"),
+    ClassInfo(4, "9:00 AM - 10:00 AM", "CrossFit: 9:00 AM", "Devin Leishman", "b4-b5-l2-593_15-button_reservationOpen", "BOOK"),
+    ClassInfo(5, "10:00 AM - 12:00 PM", "OPEN GYM", "", "b4-b5-l2-593_16-button_classNoLimit", "BOOK"),
+    ClassInfo(6, "12:00 PM - 1:00 PM", "CrossFit: 12:00 PM", "Devin Leishman", "b4-b5-l2-593_17-button_reservationOpen", "BOOK"),
+    ClassInfo(7, "4:30 PM - 5:30 PM", "CrossFit: 4:30 PM", "Devin Leishman", "b4-b5-l2-593_19-button_reservationOpen", "BOOK"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("compare_prompts")
+    client = ollama.Client(host=Config.OLLAMA_HOST)
+
+    print(f"Model: {Config.OLLAMA_MODEL}\n")
+    print(f"{'style':8s} {'run':>3s} {'est. tokens':>11s} {'prompt_eval_count':>17s} {'prefill ms':>10s} {'total ms':>9s}")
+    for style in ("full", "compact"):
+        builder = PromptBuilder(logger, style)
+        messages = builder.messages(SAMPLE_CLASSES)
+        estimated = sum(estimate_tokens(m["content"]) for m in messages)
+        for run in range(1, args.runs + 1):
+            response = client.chat(
+                model=Config.OLLAMA_MODEL,
+                messages=messages,
+                format="json",
+                options={"temperature": 0},
+                keep_alive=Config.OLLAMA_KEEP_ALIVE,
+            )
+            print(
+                f"{style:8s} {run:3d} {estimated:11d} {response.get('prompt_eval_count') or 0:17d} "
+                f"{(response.get('prompt_eval_duration') or 0) / 1e6:10.0f} {(response.get('total_duration') or 0) / 1e6:9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,35 @@
-"""Debug script to diagnose login issues with screenshots at each step"""
+"""Debug script to diagnose login issues with a snapshot at each step
+
+Snapshots (viewport JPEG + DOM) are kept in memory by the flight recorder
+and only written to the screenshots directory when the login fails.
+"""
 
 import re
 import os
 import sys
-from datetime import datetime
-from pathlib import Path
+import logging
 from playwright.sync_api import sync_playwright
 
-WODIFY_URL = "https://app.wodify.com"
+from app.services.flight_recorder import FlightRecorder
+
+WODIFY_URL = os.getenv("WODIFY_URL", "https://app.wodify.com")
 EMAIL = os.getenv("EMAIL")
 PASSWORD = os.getenv("PASSWORD")
-SCREENSHOT_DIR = Path("/workspace/screenshots/debug")
-
 
-def clear_screenshot_dir():
-    """Delete existing debug screenshots and recreate the directory"""
-    import shutil
-    if SCREENSHOT_DIR.exists():
-        shutil.rmtree(SCREENSHOT_DIR)
-    SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
+logging.basicConfig(level=logging.INFO, format="  %(message)s")
+recorder = FlightRecorder(logging.getLogger("debug_login"), capacity=50, images=True)
 
 
 def screenshot(page, name: str):
-    """Take a screenshot with timestamp"""
-    SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%H%M%S")
-    filename = f"{ts}_{name}.png"
-    path = SCREENSHOT_DIR / filename
-    page.screenshot(path=str(path), full_page=True)
-    print(f"  📸 Saved: {path}")
+    """Record a snapshot (written to disk only if the run fails)"""
+    recorder.capture(page, name)
+    print(f"  📸 Recorded: {name}")
+
+
+def fail(page, name: str, reason: str):
+    """Record the failing page and write every snapshot so far"""
+    screenshot(page, name)
+    recorder.dump(reason)
 
 
 def dump_form_fields(page):
@@ -60,7 +61,6 @@ def dump_form_fields(page):
 
 
 def main():
-    clear_screenshot_dir()
     print(f"\n{'='*60}")
     print("🔧 Wodify Login Debug Script")
     print(f"{'='*60}\n")
@@ -116,6 +116,7 @@ def main():
                 else:
                     print("  ❌ No CONTINUE button found!")
                     dump_form_fields(page)
+                    fail(page, "02_no_continue", "No CONTINUE button")
                     return
             else:
                 # Old flow: click login link first
@@ -128,8 +129,8 @@ def main():
                     screenshot(page, "02_after_login_click")
                 else:
                     print("  ❌ No login method found!")
-                    screenshot(page, "02_no_login_method")
                     dump_form_fields(page)
+                    fail(page, "02_no_login_method", "No login method found")
                     return
 
                 # Step 3: Fill email (old flow)
@@ -145,6 +146,7 @@ def main():
                         screenshot(page, "03_email_filled_alt")
                     else:
                         print("  ❌ No email field found!")
+                        fail(page, "03_no_email_field", "No email field found")
                         return
 
             # Step 3: Now we should be on password page (both flows converge here)
@@ -165,7 +167,7 @@ def main():
                 else:
                     print("  ❌ No password field found at all!")
                     dump_form_fields(page)
-                    screenshot(page, "05_no_password_field")
+                    fail(page, "05_no_password_field", "No password field found")
                     print("\n  💡 The page might need more time to load, or the login flow changed")
                     return
 
@@ -196,7 +198,7 @@ def main():
                 screenshot(page, "07_logged_in")
             else:
                 print("  ❌ Login may have failed - no Class Calendar found")
-                screenshot(page, "07_login_failed")
+                fail(page, "07_login_failed", "No Class Calendar menu after sign in")
 
                 # Check for error messages
                 error = page.locator(".error, .alert-danger, [class*='error']")
@@ -204,14 +206,13 @@ def main():
                     print(f"  ⚠️  Error message: {error.first.inner_text()[:100]}")
 
             print("\n" + "="*60)
-            print("Debug complete! Check screenshots in:")
-            print(f"  {SCREENSHOT_DIR}")
+            print("Debug complete! Snapshots are written to the screenshots directory only on failure")
             print("="*60 + "\n")
 
         except Exception as e:
             print(f"\n❌ Exception: {e}")
-            screenshot(page, "error")
             dump_form_fields(page)
+            fail(page, "error", str(e))
 
         finally:
             browser.close()
@@ -0,0 +1,131 @@
+"""
+Schedules with known correct selections, for scripts/bench_llm_selection.py
+
+Each case follows system_prompt.txt with the default 7:00-8:00 AM window:
+`expected` holds every index the prompt allows, `notify` the expected
+notify_user flag (None where the prompt leaves it open).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.models import ClassInfo
+
+
+@dataclass
+class SelectionCase:
+    name: str
+    classes: list[ClassInfo]
+    expected: set[int]
+    notify: Optional[bool]
+
+
+def schedule(*rows: tuple[str, str]) -> list[ClassInfo]:
+    """ClassInfo list from (time_range, class_name) rows, all bookable"""
+    classes = []
+    for i, (time_range, class_name) in enumerate(rows):
+        kind = "classNoLimit" if "OPEN GYM" in class_name.upper() else "reservationOpen"
+        coach = "" if kind == "classNoLimit" else "Devin Leishman"
+        classes.append(ClassInfo(i, time_range, class_name, coach, f"b4-b5-l2-593_{11 + i}-button_{kind}", "BOOK"))
+    return classes
+
+
+CASES = [
+    SelectionCase(
+        "regular day",
+        schedule(
+            ("5:00 AM - 6:00 AM", "OPEN GYM"),
+            ("6:00 AM - 7:00 AM", "CrossFit: 6:00 AM"),
+            ("7:00 AM - 8:00 AM", "CrossFit: 7:00 AM"),
+            ("8:00 AM - 9:00 AM", "CrossFit: 8:00 AM"),
+            ("9:00 AM - 10:00 AM", "CrossFit: 9:00 AM"),
+            ("10:00 AM - 12:00 PM", "OPEN GYM"),
+            ("12:00 PM - 1:00 PM", "CrossFit: 12:00 PM"),
+            ("4:30 PM - 5:30 PM", "CrossFit: 4:30 PM"),
+            ("5:30 PM - 6:30 PM", "CrossFit: 5:30 PM"),
+        ),
+        {2},
+        False,
+    ),
+    SelectionCase(
+        "7:30 start inside the window",
+        schedule(
+            ("6:00 AM - 7:00 AM", "CrossFit: 6:00 AM"),
+            ("7:30 AM - 8:30 AM", "CrossFit: 7:30 AM"),
+            ("9:00 AM - 10:00 AM", "CrossFit: 9:00 AM"),
+        ),
+        {1},
+        False,
+    ),
+    SelectionCase(
+        "OPEN GYM only",
+        schedule(
+            ("5:00 AM - 6:00 AM", "OPEN GYM"),
+            ("10:00 AM - 12:00 PM", "OPEN GYM"),
+        ),
+        {0},
+        True,
+    ),
+    SelectionCase(
+        'ALL DAY "CHAD"',
+        schedule(
+            ("5:00 AM - 6:00 AM", "OPEN GYM"),
+            ("6:00 AM - 7:00 PM", 'ALL DAY "CHAD"'),
+            ("10:00 AM - 12:00 PM", "OPEN GYM"),
+        ),
+        {1},
+        True,
+    ),
+    SelectionCase(
+        "named WOD in the window",
+        schedule(
+            ("5:00 AM - 6:00 AM", "OPEN GYM"),
+            ("6:00 AM - 7:00 AM", "CrossFit: 6:00 AM"),
+            ("7:00 AM - 8:00 AM", "MURPH"),
+            ("8:00 AM - 9:00 AM", "CrossFit: 8:00 AM"),
+            ("10:00 AM - 12:00 PM", "OPEN GYM"),
+        ),
+        {2},
+        True,
+    ),
+    SelectionCase(
+        "no 7-8 AM class",
+        schedule(
+            ("5:00 AM - 6:00 AM", "CrossFit: 5:00 AM"),
+            ("8:30 AM - 9:30 AM", "CrossFit: 8:30 AM"),
+            ("10:00 AM - 12:00 PM", "OPEN GYM"),
+        ),
+        {1},
+        True,
+    ),
+    SelectionCase(
+        "long OPEN GYM over the window",
+        schedule(
+            ("6:00 AM - 12:00 PM", "OPEN GYM"),
+            ("9:00 AM - 10:00 AM", "CrossFit: 9:00 AM"),
+        ),
+        {1},
+        True,
+    ),
+    SelectionCase(
+        "equidistant 6 and 8 AM",
+        schedule(
+            ("5:00 AM - 6:00 AM", "OPEN GYM"),
+            ("6:00 AM - 7:00 AM", "CrossFit: 6:00 AM"),
+            ("8:00 AM - 9:00 AM", "CrossFit: 8:00 AM"),
+            ("12:00 PM - 1:00 PM", "CrossFit: 12:00 PM"),
+        ),
+        {1, 2},
+        None,
+    ),
+    SelectionCase(
+        "afternoon only",
+        schedule(
+            ("12:00 PM - 1:00 PM", "CrossFit: 12:00 PM"),
+            ("4:30 PM - 5:30 PM", "CrossFit: 4:30 PM"),
+            ("5:30 PM - 6:30 PM", "CrossFit: 5:30 PM"),
+        ),
+        {0},
+        True,
+    ),
+]
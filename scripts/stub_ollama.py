@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Ollama HTTP API, for benchmarks without a GPU or model
+Usage: PYTHONPATH=. python scripts/stub_ollama.py [--port 11434] [--eval-ms 2]
+
+Serves the calls LLMService makes:
+  POST /api/chat      (streamed or not; answers the class list(s) in the user message)
+  POST /api/generate  (warm-up / unload with an empty prompt)
+
+Answers come from the rule engine, falling back to its heuristic pick, so
+they are right on clear-cut days and plausible elsewhere. Latency is
+simulated: a one-off load per model, then prefill and generation time per
+token, scaled by the parameter count in the model tag (qwen3:0.6b is ~13x
+faster than qwen3:8b). The reported durations match what was slept.
+"""
+
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.models import ClassInfo
+from app.services.preferences import PreferenceEngine
+from app.services.prompt_builder import estimate_tokens
+
+COMPACT_ROW = re.compile(r"^(\d+)\|([^|]+)\|([^|]+)\|(\w+)$")
+FULL_ROW = re.compile(r"^(\d+):\s+(.+?)\s+\|\s+(.+?)\s+\|.*Button:\s+([^(]*?)\s*(?:\(|$)")
+# Button text standing in for each compact state token
+STATE_BUTTONS = {"BOOK": "BOOK", "BOOKED": "CANCEL", "FULL": "WAITLIST", "CLOSED": ""}
+SCHEDULE_HEADER = re.compile(r"^Schedule \d+:$", re.M)
+MODEL_SIZE = re.compile(r":(\d+(?:\.\d+)?)b", re.I)
+REFERENCE_BILLIONS = 8.0
+
+
+def parse_classes(text: str) -> list[ClassInfo]:
+    """Class rows from a compact (index|time|name|state) or full (NN: time | name | ... | Button: ...) prompt"""
+    classes = []
+    for line in text.splitlines():
+        match = COMPACT_ROW.match(line.strip()) or FULL_ROW.match(line.strip())
+        if match:
+            button = STATE_BUTTONS.get(match.group(4), match.group(4))
+            classes.append(ClassInfo(int(match.group(1)), match.group(2).strip(), match.group(3).strip(), "", "stub", button))
+    return classes
+
+
+def size_factor(model: str) -> float:
+    """Relative cost of a model against an 8B one, from its tag"""
+    match = MODEL_SIZE.search(model)
+    return float(match.group(1)) / REFERENCE_BILLIONS if match else 1.0
+
+
+class StubOllamaState:
+    """Shared state for the stub server"""
+
+    def __init__(self, load_ms: float = 1500, prefill_ms: float = 0.5, eval_ms: float = 2.0):
+        self.load_ms = load_ms
+        self.prefill_ms = prefill_ms  # Per prompt token for an 8B model
+        self.eval_ms = eval_ms  # Per generated token for an 8B model
+        self.loaded: set[str] = set()
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.engine = PreferenceEngine(logging.getLogger("stub_ollama"))
+
+    def load(self, model: str) -> float:
+        """Simulated load time in ms (zero once the model is resident)"""
+        with self.lock:
+            self.request_count += 1
+            if model in self.loaded:
+                return 0.0
+            self.loaded.add(model)
+        return self.load_ms * size_factor(model)
+
+    def answer(self, messages: list[dict], schema: dict) -> dict:
+        """The JSON object the "model" replies with"""
+        user = next((m["content"] for m in messages if m["role"] == "user"), "")
+        if "selections" in (schema or {}).get("properties", {}):
+            blocks = SCHEDULE_HEADER.split(user)[1:]
+            return {"selections": [self.select(block, {}) for block in blocks]}
+        return self.select(user, schema)
+
+    def select(self, user: str, schema: dict) -> dict:
+        """Answer for one class list"""
+        classes = parse_classes(user)
+        if not classes:
+            return {"selected_index": 0, "reasoning": "No classes listed.", "notify_user": True}
+        decision = self.engine.select(classes)
+        confident = decision is not None
+        decision = decision or self.engine.fallback(classes)
+        answer = {
+            "selected_index": decision.selected_index,
+            "reasoning": decision.reasoning,
+            "notify_user": decision.notify_user,
+        }
+        if "confidence" in (schema or {}).get("properties", {}):
+            answer["confidence"] = 0.95 if confident else 0.55
+        return answer
+
+
+def make_handler(state: StubOllamaState):
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _durations(self, model: str, load_ms: float, prompt_tokens: int, eval_tokens: int) -> dict:
+            factor = size_factor(model)
+            prefill_ms = prompt_tokens * state.prefill_ms * factor
+            eval_ms = eval_tokens * state.eval_ms * factor
+            return {
+                "load_duration": int(load_ms * 1e6),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(prefill_ms * 1e6),
+                "eval_count": eval_tokens,
+                "eval_duration": int(eval_ms * 1e6),
+                "total_duration": int((load_ms + prefill_ms + eval_ms) * 1e6),
+            }
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send_json(400, {"error": "invalid JSON body"})
+
+            model = body.get("model", "")
+            created_at = datetime.now(timezone.utc).isoformat()
+            load_ms = state.load(model)
+
+            if self.path == "/api/generate":
+                time.sleep(load_ms / 1000)
+                if body.get("keep_alive") == 0:
+                    state.loaded.discard(model)
+                return self._send_json(
+                    200,
+                    {"model": model, "created_at": created_at, "response": "", "done": True,
+                     "load_duration": int(load_ms * 1e6), "total_duration": int(load_ms * 1e6)},
+                )
+            if self.path != "/api/chat":
+                return self._send_json(404, {"error": f"unknown path {self.path}"})
+
+            messages = body.get("messages", [])
+            content = json.dumps(state.answer(messages, body.get("format")))
+            prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+            durations = self._durations(model, load_ms, prompt_tokens, estimate_tokens(content))
+            time.sleep((load_ms + durations["prompt_eval_duration"] / 1e6) / 1000)
+
+            if not body.get("stream", True):
+                time.sleep(durations["eval_duration"] / 1e9)
+                return self._send_json(
+                    200,
+                    {"model": model, "created_at": created_at, "message": {"role": "assistant", "content": content},
+                     "done": True, "done_reason": "stop", **durations},
+                )
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            per_token = state.eval_ms * size_factor(model) / 1000
+            for piece in re.findall(r".{1,4}", content, re.S):
+                time.sleep(per_token)
+                line = {"model": model, "created_at": created_at,
+                        "message": {"role": "assistant", "content": piece}, "done": False}
+                self.wfile.write(json.dumps(line).encode() + b"\n")
+                self.wfile.flush()
+            final = {"model": model, "created_at": created_at, "message": {"role": "assistant", "content": ""},
+                     "done": True, "done_reason": "stop", **durations}
+            self.wfile.write(json.dumps(final).encode() + b"\n")
+
+    return StubOllamaHandler
+
+
+def start_stub_ollama(port: int = 0, **timings) -> tuple[ThreadingHTTPServer, StubOllamaState]:
+    """Start the stub in a background thread (port 0 picks a free port)"""
+    state = StubOllamaState(**timings)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--load-ms", type=float, default=1500, help="Load time of an 8B model")
+    parser.add_argument("--prefill-ms", type=float, default=0.5, help="Per prompt token, 8B model")
+    parser.add_argument("--eval-ms", type=float, default=2.0, help="Per generated token, 8B model")
+    args = parser.parse_args()
+
+    server, _ = start_stub_ollama(args.port, load_ms=args.load_ms, prefill_ms=args.prefill_ms, eval_ms=args.eval_ms)
+    print(f"Stub Ollama listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
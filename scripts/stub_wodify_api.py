@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Local stub of Wodify's calendar and reservation endpoints
+Usage: python scripts/stub_wodify_api.py [--port 8765] [--contract-version 2]
+
+Mimics the OutSystems screen-service requests that WodifyApiClient replays:
+  POST /screenservices/ClassCalendar/DataActionGetClasses  (date in screenData)
+  POST /screenservices/ClassCalendar/ActionReserveClass     (class id in inputParameters)
+
+Requests must carry the session cookie and matching X-CSRFToken header.
+--contract-version 2 returns a reshaped calendar payload so contract-change
+detection can be exercised.
+"""
+
+import json
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+CSRF_TOKEN = "stub-csrf-token"
+SESSION_COOKIES = {"osVisitor": "stub-visitor", "nr2Users": quote(f"crf={CSRF_TOKEN};uid=42;unm=stub@example.com")}
+CALENDAR_PATH = "/screenservices/ClassCalendar/DataActionGetClasses"
+RESERVE_PATH = "/screenservices/ClassCalendar/ActionReserveClass"
+
+# (start, end, name, coach, capacity, reserved)
+DAILY_SCHEDULE = [
+    ("05:00", "06:00", "OPEN GYM", "", 0, 0),
+    ("06:00", "07:00", "CrossFit: 6:00 AM", "Devin Leishman", 12, 5),
+    ("07:00", "08:00", "CrossFit: 7:00 AM", "Tyler Johnson", 12, 11),
+    ("08:00", "09:00", "CrossFit: 8:00 AM", "Devin Leishman", 12, 3),
+    ("09:00", "10:00", "CrossFit: 9:00 AM", "Devin Leishman", 12, 0),
+    ("10:00", "12:00", "OPEN GYM", "", 0, 0),
+    ("12:00", "13:00", "CrossFit: 12:00 PM", "Devin Leishman", 12, 2),
+    ("16:30", "17:30", "CrossFit: 4:30 PM", "Devin Leishman", 12, 7),
+    ("17:30", "18:30", "CrossFit: 5:30 PM", "Devin Leishman", 12, 12),
+]
+
+
+def class_id(date: str, index: int) -> str:
+    return f"{date.replace('-', '')}{index:02d}"
+
+
+def calendar_records(date: str, reservations: dict) -> list[dict]:
+    """Class records for a date in OutSystems list shape"""
+    records = []
+    for i, (start, end, name, coach, capacity, reserved) in enumerate(DAILY_SCHEDULE):
+        cid = class_id(date, i)
+        reserved += reservations.get(cid, 0)
+        records.append({
+            "Class": {
+                "Id": cid,
+                "Name": name,
+                "StartDateTime": f"{date}T{start}:00",
+                "EndDateTime": f"{date}T{end}:00",
+                "Capacity": capacity,
+                "ReservationCount": reserved,
+            },
+            "Coach": {"Name": coach},
+        })
+    return records
+
+
+class StubState:
+    """Shared state for the stub server"""
+
+    def __init__(self, contract_version: int = 1, latency_ms: int = 0):
+        self.contract_version = contract_version
+        self.latency_ms = latency_ms
+        self.reservations: dict[str, int] = {}
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StubState):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorised(self) -> bool:
+            cookies = dict(
+                part.strip().split("=", 1) for part in self.headers.get("Cookie", "").split(";") if "=" in part
+            )
+            return (
+                all(cookies.get(name) == value for name, value in SESSION_COOKIES.items())
+                and self.headers.get("X-CSRFToken") == CSRF_TOKEN
+            )
+
+        def do_POST(self):
+            with state.lock:
+                state.request_count += 1
+            if state.latency_ms:
+                threading.Event().wait(state.latency_ms / 1000)
+
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send_json(400, {"exception": {"name": "BadRequest"}})
+
+            if self.path not in (CALENDAR_PATH, RESERVE_PATH):
+                return self._send_json(404, {"exception": {"name": "NotFound"}})
+            if not self._authorised():
+                return self._send_json(403, {"exception": {"name": "NotRegisteredException"}})
+
+            if self.path == CALENDAR_PATH:
+                date = body.get("screenData", {}).get("variables", {}).get("SelectedDate", "")[:10]
+                records = calendar_records(date, state.reservations)
+                if state.contract_version == 1:
+                    data = {"Classes": {"List": records}}
+                else:
+                    data = {"Items": [{"label": r["Class"]["Name"], "when": r["Class"]["StartDateTime"]} for r in records]}
+                return self._send_json(200, {"versionInfo": {"hasModuleVersionChanged": False}, "data": data})
+
+            cid = str(body.get("inputParameters", {}).get("ClassId", ""))
+            index = int(cid[-2:]) if cid[-2:].isdigit() else -1
+            with state.lock:
+                if 0 <= index < len(DAILY_SCHEDULE):
+                    capacity, reserved = DAILY_SCHEDULE[index][4:]
+                    if capacity and reserved + state.reservations.get(cid, 0) >= capacity:
+                        data = {"Success": False, "Message": "Class is full"}
+                        return self._send_json(200, {"versionInfo": {"hasModuleVersionChanged": False}, "data": data})
+                state.reservations[cid] = state.reservations.get(cid, 0) + 1
+            return self._send_json(200, {"versionInfo": {"hasModuleVersionChanged": False}, "data": {"Success": True}})
+
+    return StubHandler
+
+
+def start_stub(port: int = 0, contract_version: int = 1, latency_ms: int = 0) -> tuple[ThreadingHTTPServer, StubState]:
+    """Start the stub in a background thread (port 0 picks a free port)"""
+    state = StubState(contract_version, latency_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def stub_contract(base_url: str) -> dict:
+    """Request templates matching what BrowserService would record against the stub"""
+    sample_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    return {
+        "calendar": {
+            "url": f"{base_url}{CALENDAR_PATH}",
+            "body": {
+                "versionInfo": {"moduleVersion": "stub", "apiVersion": "stub"},
+                "viewName": "Calendar.ClassCalendar",
+                "screenData": {"variables": {"SelectedDate": f"{sample_date}T00:00:00"}},
+            },
+            "headers": {"OutSystems-locale": "en-US"},
+            "variable": sample_date,
+            "prefix": True,
+        },
+        "reservation": {
+            "url": f"{base_url}{RESERVE_PATH}",
+            "body": {"versionInfo": {"moduleVersion": "stub"}, "inputParameters": {"ClassId": "0"}},
+            "headers": {},
+            "variable": "0",
+            "prefix": False,
+        },
+    }
+
+
+def stub_storage_state() -> dict:
+    """A Playwright storage_state holding the stub's session cookies"""
+    return {
+        "cookies": [
+            {"name": name, "value": value, "domain": "127.0.0.1", "path": "/"}
+            for name, value in SESSION_COOKIES.items()
+        ],
+        "origins": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--contract-version", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server, _ = start_stub(args.port, args.contract_version, args.latency_ms)
+    print(f"Stub Wodify API listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
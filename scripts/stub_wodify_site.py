@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Wodify web app
+Usage: PYTHONPATH=. python scripts/stub_wodify_site.py [--port 8766] [--latency-ms 150]
+
+Serves a single-page imitation of the parts of app.wodify.com that
+BrowserService drives: email -> CONTINUE -> password -> Sign in, the Class
+Calendar menu item, a week of date tiles with paging, class rows using the
+real `.list-item[data-list-item]` markup and button ids, and the Confirm
+Booking dialog. Calendar data and reservations go through the same
+screen-service endpoints as scripts/stub_wodify_api.py, so data-feed parsing
+and API contract recording work against it too.
+
+Point the app at it with:
+    WODIFY_URL=http://127.0.0.1:8766 EMAIL=stub@example.com PASSWORD=stub \\
+        PUSHOVER_USER_KEY=dummy PUSHOVER_APP_TOKEN=dummy PYTHONPATH=. python app/main.py
+
+--latency-ms delays every response (pages, assets and API calls) so the full
+flow can be benchmarked under realistic network conditions.
+"""
+
+import json
+import argparse
+import threading
+from http.server import ThreadingHTTPServer
+
+from scripts.stub_wodify_api import CALENDAR_PATH, RESERVE_PATH, SESSION_COOKIES, StubState, make_handler
+
+LOGIN_PATH = "/login"
+LOGO_BYTES = bytes(range(256)) * 80  # ~20 KB "image" so the resource filter has something to block
+
+PAGE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Wodify (offline stub)</title>
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  nav { display: flex; gap: 16px; padding: 12px; background: #222; color: #fff; }
+  .strip { display: flex; gap: 8px; padding: 12px; align-items: center; }
+  .date-tile { border: 1px solid #ccc; padding: 6px 10px; cursor: pointer; text-align: center; }
+  .date-tile.selected { background: #def; }
+  .list-item { display: flex; gap: 16px; padding: 8px 12px; border-bottom: 1px solid #eee; align-items: center; }
+  .dialog { position: fixed; top: 30%; left: 35%; padding: 24px; background: #fff; border: 2px solid #333; }
+  .hidden { display: none; }
+</style>
+</head>
+<body>
+<img src="/static/logo.png" alt="logo" width="40" height="40">
+<div id="app"></div>
+<script>
+const CALENDAR_PATH = "__CALENDAR_PATH__";
+const RESERVE_PATH = "__RESERVE_PATH__";
+const LOGIN_PATH = "__LOGIN_PATH__";
+const app = document.getElementById("app");
+let weekStart = startOfDay(new Date());
+let selected = null;
+let bookingClassId = null;
+const bookedIds = new Set();
+
+function startOfDay(d) { return new Date(d.getFullYear(), d.getMonth(), d.getDate()); }
+function addDays(d, n) { const c = new Date(d); c.setDate(c.getDate() + n); return c; }
+function iso(d) {
+    const pad = (n) => String(n).padStart(2, "0");
+    return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+}
+function clock(value) {
+    const d = new Date(value);
+    const h = d.getHours() % 12 || 12;
+    return `${h}:${String(d.getMinutes()).padStart(2, "0")} ${d.getHours() < 12 ? "AM" : "PM"}`;
+}
+function csrfToken() {
+    const cookie = document.cookie.split("; ").find((c) => c.startsWith("nr2Users="));
+    const match = cookie && decodeURIComponent(cookie.split("=")[1]).match(/crf=([^;]+)/);
+    return match ? match[1] : "";
+}
+function loggedIn() { return csrfToken() !== ""; }
+
+async function screenService(path, body) {
+    const response = await fetch(path, {
+        method: "POST",
+        headers: {"Content-Type": "application/json; charset=UTF-8", "X-CSRFToken": csrfToken()},
+        body: JSON.stringify(body),
+    });
+    return response.json();
+}
+
+function renderLogin() {
+    app.innerHTML = `
+        <div class="login">
+            <label for="Input_UserName2">Email</label>
+            <input type="email" id="Input_UserName2" aria-label="Email">
+            <button id="continue">CONTINUE</button>
+            <div id="password-step" class="hidden">
+                <label for="Input_Password">Password</label>
+                <input type="password" id="Input_Password" aria-label="Password">
+                <button id="signin">Sign in</button>
+            </div>
+        </div>`;
+    document.getElementById("continue").onclick = () => {
+        setTimeout(() => document.getElementById("password-step").classList.remove("hidden"), 50);
+    };
+    document.getElementById("signin").onclick = async () => {
+        await fetch(LOGIN_PATH, {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({
+                email: document.getElementById("Input_UserName2").value,
+                password: document.getElementById("Input_Password").value,
+            }),
+        });
+        renderShell();
+    };
+}
+
+function renderShell() {
+    app.innerHTML = `
+        <nav role="menubar">
+            <span role="menuitem" tabindex="0" id="menu-dashboard">Dashboard</span>
+            <span role="menuitem" tabindex="0" id="menu-calendar">Class Calendar</span>
+        </nav>
+        <div id="calendar"></div>`;
+    document.getElementById("menu-calendar").onclick = () => {
+        weekStart = startOfDay(new Date());
+        selectDate(weekStart);
+    };
+}
+
+function renderStrip() {
+    const tiles = [...Array(7).keys()].map((i) => {
+        const d = addDays(weekStart, i);
+        const label = d.toLocaleDateString("en-US", {weekday: "short"});
+        const cls = selected && iso(d) === iso(selected) ? "date-tile selected" : "date-tile";
+        return `<div class="${cls}" data-iso="${iso(d)}"><div>${label}</div><div>${d.getMonth() + 1}/${d.getDate()}</div></div>`;
+    });
+    return `<div class="strip">
+        <button aria-label="Previous week" id="prev-week">&lsaquo;</button>
+        ${tiles.join("")}
+        <button aria-label="Next week" id="next-week">&rsaquo;</button>
+    </div>`;
+}
+
+function renderRow(record) {
+    const c = record.Class;
+    const full = c.Capacity > 0 && c.ReservationCount >= c.Capacity;
+    const booked = bookedIds.has(String(c.Id));
+    const label = booked ? "Cancel" : full ? "Waitlist" : "Book";
+    return `<div class="list-item" data-list-item>
+        <div class="list-item-content-left"><div>${clock(c.StartDateTime)} - ${clock(c.EndDateTime)}</div><div>${c.Capacity ? `${c.ReservationCount}/${c.Capacity}` : ""}</div></div>
+        <div class="list-item-content-center">
+            <div class="font-size-m"><span>${c.Name}</span></div>
+            <a href="#">${record.Coach.Name}</a>
+        </div>
+        <button id="b${c.Id}" data-class-id="${c.Id}" data-label="${label}">${label}</button>
+    </div>`;
+}
+
+async function selectDate(date) {
+    selected = date;
+    const calendar = document.getElementById("calendar");
+    calendar.innerHTML = renderStrip() + `<div id="rows">Loading...</div>`;
+    bindStrip();
+    const payload = await screenService(CALENDAR_PATH, {
+        versionInfo: {moduleVersion: "stub", apiVersion: "stub"},
+        viewName: "Calendar.ClassCalendar",
+        screenData: {variables: {SelectedDate: `${iso(date)}T00:00:00`}},
+    });
+    if (iso(selected) !== iso(date)) return;
+    const records = (payload.data && payload.data.Classes && payload.data.Classes.List) || [];
+    document.getElementById("rows").innerHTML = records.map(renderRow).join("");
+    document.querySelectorAll("#rows button").forEach((button) => {
+        button.onclick = () => {
+            if (button.dataset.label !== "Book") return;
+            bookingClassId = button.dataset.classId;
+            document.getElementById("dialog").classList.remove("hidden");
+        };
+    });
+}
+
+function bindStrip() {
+    document.querySelectorAll(".date-tile").forEach((tile) => {
+        tile.onclick = () => selectDate(new Date(tile.dataset.iso + "T00:00:00"));
+    });
+    document.getElementById("prev-week").onclick = () => { weekStart = addDays(weekStart, -7); selectDate(weekStart); };
+    document.getElementById("next-week").onclick = () => { weekStart = addDays(weekStart, 7); selectDate(weekStart); };
+}
+
+document.body.insertAdjacentHTML("beforeend", `
+    <div id="dialog" class="dialog hidden">
+        <p>Reserve this class?</p>
+        <button id="confirm">Confirm Booking</button>
+    </div>`);
+document.getElementById("confirm").onclick = async () => {
+    await screenService(RESERVE_PATH, {
+        versionInfo: {moduleVersion: "stub"},
+        inputParameters: {ClassId: bookingClassId},
+    });
+    bookedIds.add(bookingClassId);
+    document.getElementById("dialog").classList.add("hidden");
+    selectDate(selected);
+};
+
+if (loggedIn()) { renderShell(); } else { renderLogin(); }
+</script>
+</body>
+</html>
+"""
+
+
+def render_page() -> bytes:
+    return (
+        PAGE_HTML.replace("__CALENDAR_PATH__", CALENDAR_PATH)
+        .replace("__RESERVE_PATH__", RESERVE_PATH)
+        .replace("__LOGIN_PATH__", LOGIN_PATH)
+        .encode()
+    )
+
+
+def make_site_handler(state: StubState):
+    api_handler = make_handler(state)
+
+    class SiteHandler(api_handler):
+        def _delay(self):
+            if state.latency_ms:
+                threading.Event().wait(state.latency_ms / 1000)
+
+        def _send(self, status: int, content_type: str, body: bytes, headers: dict = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            with state.lock:
+                state.request_count += 1
+            self._delay()
+            if self.path == "/static/logo.png":
+                return self._send(200, "image/png", LOGO_BYTES)
+            if self.path.split("?")[0] in ("/", "/WodifyClient/Home"):
+                return self._send(200, "text/html; charset=utf-8", render_page(), {"Cache-Control": "no-store"})
+            return self._send(404, "text/plain", b"Not found")
+
+        def do_HEAD(self):
+            # ServerClock samples the Date header with HEAD requests
+            self.do_GET()
+
+        def do_POST(self):
+            if self.path != LOGIN_PATH:
+                return super().do_POST()
+            with state.lock:
+                state.request_count += 1
+            self._delay()
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            for name, value in SESSION_COOKIES.items():
+                self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+            body = json.dumps({"data": {"Success": True}}).encode()
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return SiteHandler
+
+
+def start_site(port: int = 0, latency_ms: int = 0):
+    """Start the stand-in site in a background thread (port 0 picks a free port)"""
+    state = StubState(latency_ms=latency_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_site_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server, state = start_site(args.port, args.latency_ms)
+    print(f"Offline Wodify site listening on http://127.0.0.1:{server.server_port} (latency {args.latency_ms}ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"Served {state.request_count} requests, {sum(state.reservations.values())} reservations")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Exercise WodifyApiClient against the local stub server
+Usage: python scripts/test_api_client.py
+
+Checks a calendar fetch, a reservation, a rejected reservation, rejected
+cookies and contract-change detection without touching app.wodify.com.
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app.utils.logger import setup_logger
+from app.services.api_client import (
+    ApiContract,
+    ContractChangedError,
+    ReservationFailedError,
+    SessionExpiredError,
+    WodifyApiClient,
+)
+from scripts.stub_wodify_api import start_stub, stub_contract, stub_storage_state
+
+
+def main() -> int:
+    logger = setup_logger("api-client-test")
+    server, state = start_stub()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    contract = ApiContract(**stub_contract(base_url))
+    target_date = datetime.now() + timedelta(days=2)
+    failures = 0
+
+    client = WodifyApiClient(logger, stub_storage_state(), contract)
+    start = time.perf_counter()
+    classes = client.fetch_classes(target_date)
+    fetch_ms = (time.perf_counter() - start) * 1000
+    print(f"✓ Fetched {len(classes)} classes in {fetch_ms:.1f}ms")
+    for cls in classes:
+        print(f"  {cls.to_display_string()}  [{cls.reserved}/{cls.capacity}]")
+
+    selected = next(c for c in classes if c.class_name == "CrossFit: 7:00 AM")
+    start = time.perf_counter()
+    client.reserve(selected)
+    print(f"✓ Reserved in {(time.perf_counter() - start) * 1000:.1f}ms")
+    if state.reservations.get(selected.class_id) != 1:
+        print("✗ Stub did not record the reservation")
+        failures += 1
+
+    full = next(c for c in classes if c.class_name == "CrossFit: 5:30 PM")
+    try:
+        client.reserve(full)
+        print("✗ Reserving a full class was reported as booked")
+        failures += 1
+    except ReservationFailedError:
+        print("✓ Unsuccessful reservation raises ReservationFailedError")
+    client.close()
+
+    expired_client = WodifyApiClient(logger, {"cookies": []}, contract)
+    try:
+        expired_client.fetch_classes(target_date)
+        print("✗ Missing cookies were not detected")
+        failures += 1
+    except SessionExpiredError:
+        print("✓ Missing cookies raise SessionExpiredError")
+
+    state.contract_version = 2
+    changed_client = WodifyApiClient(logger, stub_storage_state(), contract)
+    try:
+        changed_client.fetch_classes(target_date)
+        print("✗ Contract change was not detected")
+        failures += 1
+    except ContractChangedError:
+        print("✓ Reshaped payload raises ContractChangedError")
+
+    server.shutdown()
+    print(f"\n{state.request_count} requests served, {failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())